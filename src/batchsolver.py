@@ -0,0 +1,167 @@
+# imports
+import os
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from sudoku import Sudoku
+
+
+def solvepuzzle(index, grid, options):
+    ### solve a single sudoku (used by solve_many, also inside worker processes)
+    # input arguments:
+    # - index: index of the sudoku in the batch (only passed through to the output)
+    # - grid: 2D numpy array as for Sudoku initialization (None for invalid input)
+    # - options: dict of options, see solve_many
+    # returns:
+    #   a tuple (index, outputcode, grid, message), with the output codes of Sudoku.terminate;
+    #   exceptions are caught and reported with outputcode -1 and grid None,
+    #   so that a single faulty sudoku does not stop the batch
+    if grid is None: return (index, -1, None, 'ERROR: invalid input')
+    try:
+        logfilename = None
+        if options.get('logdir') is not None:
+            logfilename = os.path.join(options['logdir'], 'log_{}.txt'.format(index))
+        S = Sudoku(grid, verbose=False, logfilename=logfilename,
+                   backend=options.get('backend', 'python'))
+        # on timeout, use the abortion flag to stop the slow solving methods
+        timer = None
+        if options.get('timeout') is not None:
+            timer = threading.Timer(options['timeout'], S.setbreak)
+            timer.start()
+        try:
+            if options.get('method', 'techniques')=='dlx':
+                (outputcode, message) = S.solve(method='dlx')
+            else:
+                (outputcode, message) = S.solve(
+                    useforcingchain=options.get('useforcingchain', True),
+                    usebruteforce=options.get('usebruteforce', False))
+        finally:
+            if timer is not None: timer.cancel()
+        if not S.contin: message = 'WARNING: timed out\n'+message
+        return (index, outputcode, S.grid, message)
+    except (Exception, SystemExit) as e:
+        return (index, -1, None, 'ERROR: {}: {}'.format(type(e).__name__, e))
+
+def solvechunk(chunk, options):
+    # solve a list of (index, grid) tuples, see solvepuzzle
+    return [solvepuzzle(index, grid, options) for (index, grid) in chunk]
+
+def solve_many(puzzles, workers=None, chunksize=8, ordered=True, **options):
+    ### solve a batch of sudokus, spread over a pool of worker processes
+    # input arguments:
+    # - puzzles: iterable of 2D numpy arrays as for Sudoku initialization
+    #   (None entries are reported as invalid);
+    #   it is consumed lazily, so it can be a generator over a large file
+    # - workers: number of worker processes (default: number of cores);
+    #   use 1 to solve in the current process
+    # - chunksize: number of sudokus sent to a worker at once
+    # - ordered: boolean whether to return the results in input order
+    #   (if False, results are returned as soon as they are available)
+    # - options: keyword arguments for each sudoku:
+    #   - method: 'techniques' or 'dlx' (see Sudoku.solve)
+    #   - backend: 'python' or 'numpy' (see Sudoku.__init__)
+    #   - useforcingchain and usebruteforce: see Sudoku.solve
+    #   - timeout: time in seconds after which slow solving methods are aborted
+    #     (the sudoku is then returned in its partially solved state)
+    #   - logdir: directory where a separate log file for each sudoku is written
+    #     (default: no log files)
+    # returns:
+    #   a generator of (index, outputcode, grid, message) tuples, see solvepuzzle
+    if workers is None: workers = multiprocessing.cpu_count()
+    if workers==1:
+        for index, grid in enumerate(puzzles):
+            yield solvepuzzle(index, grid, options)
+        return
+    pool = WorkerPool(workers, options)
+    # only a limited number of chunks is dispatched at any time,
+    # so that the input is not read into memory all at once
+    maxpending = 2*workers
+    pending = deque()
+    try:
+        chunk = []
+        for index, grid in enumerate(puzzles):
+            chunk.append((index, grid))
+            if len(chunk)<chunksize: continue
+            pending.append(pool.submit(chunk))
+            chunk = []
+            while len(pending)>=maxpending:
+                for result in _nextchunk(pool, pending, ordered): yield result
+        if len(chunk)>0: pending.append(pool.submit(chunk))
+        while len(pending)>0:
+            for result in _nextchunk(pool, pending, ordered): yield result
+    finally:
+        pool.close()
+
+def _nextchunk(pool, pending, ordered):
+    # remove the next finished chunk from a deque of pending tasks (see WorkerPool.submit)
+    # and return its results (the first one in order, or the first one that is ready)
+    if ordered: task = pending.popleft()
+    else:
+        wait([future for (future, chunk) in pending], return_when=FIRST_COMPLETED)
+        task = [task for task in pending if task[0].done()][0]
+        pending.remove(task)
+    return pool.result(task, pending)
+
+
+class WorkerPool(object):
+    ### process pool used by solve_many, which survives the death of a worker process
+    # (e.g. by a segmentation fault or an out-of-memory kill, which cannot be caught
+    #  in solvepuzzle): the pool is then replaced by a new one, all unfinished chunks
+    #  are submitted again, and the sudokus of the chunk that is waited for are solved
+    #  one at a time in a separate single-process pool, so that the sudoku that kills
+    #  its worker can be reported as invalid (with outputcode -1, as in solvepuzzle)
+    #  without losing the other ones
+
+    def __init__(self, workers, options):
+        ### initializer
+        # input arguments:
+        # - workers: number of worker processes
+        # - options: dict of options for each sudoku, see solve_many
+        self.workers = workers
+        self.options = options
+        self.executor = ProcessPoolExecutor(workers)
+        self.isolated = None # (single-process pool, only started when needed)
+
+    def submit(self, chunk):
+        # start solving a list of (index, grid) tuples (see solvechunk)
+        # returns: a task, i.e. a tuple (future, chunk)
+        # (if the pool is already broken, the future fails in the same way as the others,
+        #  so that this is handled when its results are needed, see result)
+        try: future = self.executor.submit(solvechunk, chunk, self.options)
+        except BrokenProcessPool as e:
+            future = Future()
+            future.set_exception(e)
+        return (future, chunk)
+
+    def restart(self, pending):
+        # replace a broken pool by a new one,
+        # and submit the pending tasks that did not finish (in place)
+        self.executor.shutdown(wait=False)
+        self.executor = ProcessPoolExecutor(self.workers)
+        for k, (future, chunk) in enumerate(pending):
+            if not future.done() or future.exception() is not None: pending[k] = self.submit(chunk)
+
+    def result(self, task, pending):
+        # wait for the results of a task (see submit)
+        # (pending is the deque of other tasks, submitted again if the pool breaks)
+        (future, chunk) = task
+        try: return future.result()
+        except BrokenProcessPool: self.restart(pending)
+        results = []
+        for (index, grid) in chunk:
+            if self.isolated is None: self.isolated = ProcessPoolExecutor(1)
+            try:
+                results.extend(self.isolated.submit(solvechunk, [(index, grid)],
+                                                    self.options).result())
+            except BrokenProcessPool:
+                results.append((index, -1, None, 'ERROR: worker process died'))
+                self.isolated.shutdown(wait=False)
+                self.isolated = None
+        return results
+
+    def close(self):
+        # stop the pools without waiting for the chunks that are still being solved
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.isolated is not None: self.isolated.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,139 @@
+class DancingLinks(object):
+    ### exact cover solver using Knuth's Algorithm X with dancing links
+    # the exact cover problem is given as a number of columns (constraints)
+    # and a list of rows (options), each row being a list of column indices;
+    # a solution is a set of rows that together contain each column exactly once.
+    # note: the links are modified during the search,
+    #       so a new object should be made for each search
+
+    def __init__(self, ncolumns, rows):
+        ### initializer: build the doubly linked node structure
+        # input arguments:
+        # - ncolumns: number of columns in the exact cover problem
+        # - rows: list of rows, each row being a list of column indices
+        # node 0 is the root, nodes 1 until ncolumns (included) are the column headers,
+        # all other nodes correspond to an element of a row
+        self.ncolumns = ncolumns
+        self.L = [ncolumns] + list(range(ncolumns)) # left link
+        self.R = list(range(1, ncolumns+1)) + [0] # right link
+        self.U = list(range(ncolumns+1)) # up link
+        self.D = list(range(ncolumns+1)) # down link
+        self.C = list(range(ncolumns+1)) # column header of each node
+        self.S = [0]*(ncolumns+1) # number of nodes in each column
+        self.rowof = [-1]*(ncolumns+1) # row index of each node
+        for rowindex, columns in enumerate(rows):
+            first = None
+            for column in columns:
+                header = column+1
+                node = len(self.C)
+                self.C.append(header)
+                self.rowof.append(rowindex)
+                # insert node at the bottom of its column
+                self.U.append(self.U[header])
+                self.D.append(header)
+                self.D[self.U[header]] = node
+                self.U[header] = node
+                self.S[header] += 1
+                # insert node at the end of its row
+                if first is None:
+                    first = node
+                    self.L.append(node)
+                    self.R.append(node)
+                else:
+                    self.L.append(self.L[first])
+                    self.R.append(first)
+                    self.R[self.L[first]] = node
+                    self.L[first] = node
+
+    def cover(self, header):
+        # remove a column and all rows containing it from the structure
+        L = self.L; R = self.R; U = self.U; D = self.D; C = self.C; S = self.S
+        R[L[header]] = R[header]
+        L[R[header]] = L[header]
+        i = D[header]
+        while i!=header:
+            j = R[i]
+            while j!=i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, header):
+        # restore a column removed by cover (in exactly the reverse order)
+        L = self.L; R = self.R; U = self.U; D = self.D; C = self.C; S = self.S
+        i = U[header]
+        while i!=header:
+            j = L[i]
+            while j!=i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[header]] = header
+        L[R[header]] = header
+
+    def choosecolumn(self):
+        # choose the remaining column with the smallest number of rows
+        R = self.R; S = self.S
+        best = R[0]
+        header = R[best]
+        while header!=0 and S[best]>1:
+            if S[header]<S[best]: best = header
+            header = R[header]
+        return best
+
+    def search(self, abort=None):
+        # generator yielding all exact covers, each as a list of row indices
+        # input arguments:
+        # - abort: function without arguments, called each time the search goes back
+        #   (which a long search does all the time); if it returns True,
+        #   the search stops (default: never stop)
+        # note: the search is iterative (explicit stack of chosen nodes),
+        #       so there is no recursion limit on the number of rows in a solution
+        L = self.L; R = self.R; D = self.D; C = self.C
+        if R[0]==0:
+            yield []
+            return
+        solution = []
+        header = self.choosecolumn()
+        self.cover(header)
+        node = D[header]
+        while True:
+            if node==header:
+                # all rows in this column were tried: go one step back
+                if abort is not None and abort(): return
+                self.uncover(header)
+                if len(solution)==0: return
+                node = solution.pop()
+                header = C[node]
+                j = L[node]
+                while j!=node:
+                    self.uncover(C[j])
+                    j = L[j]
+                node = D[node]
+                continue
+            # select the row of this node
+            solution.append(node)
+            j = R[node]
+            while j!=node:
+                self.cover(C[j])
+                j = R[j]
+            if R[0]==0:
+                yield [self.rowof[n] for n in solution]
+            else:
+                nextheader = self.choosecolumn()
+                if self.S[nextheader]>0:
+                    header = nextheader
+                    self.cover(header)
+                    node = D[header]
+                    continue
+            # deselect the row of this node and try the next one
+            solution.pop()
+            j = L[node]
+            while j!=node:
+                self.uncover(C[j])
+                j = L[j]
+            node = D[node]
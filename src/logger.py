@@ -0,0 +1,72 @@
+# imports
+import os
+
+# log levels (a message is written if its level is at most the level of the logger)
+SILENT = 0 # nothing is written
+RESULT = 1 # final results of the solving procedure
+INFO = 2 # progress of the solving procedure (e.g. start and end of each step)
+DEBUG = 3 # details of each solving method (e.g. each pattern that is found)
+
+
+class Logger(object):
+    ### buffered logger writing messages to stdout and/or a log file
+    # messages are given as a format string with arguments,
+    # which are only formatted if the message is actually written;
+    # arguments that are callable (e.g. Sudoku.tostring) are called at that point.
+    # messages for the log file are kept in a buffer and written at once by flush
+    # (called automatically when the buffer is full and by Sudoku.terminate)
+
+    def __init__(self, verbose=True, logfilename=None, appendlogfile=False, level=DEBUG,
+                 buffersize=1000):
+        ### initializer
+        # input arguments:
+        # - verbose: boolean whether to print messages to stdout
+        # - logfilename: path to a log file (default: no log file)
+        # - appendlogfile: boolean whether to append to log file (if it exists) or overwrite it
+        #   (ignored if logfilename is None)
+        # - level: maximum level of messages to write (see above)
+        # - buffersize: maximum number of messages kept in the buffer before writing to file
+        self.doprint = verbose
+        self.logname = logfilename
+        self.buffer = []
+        self.buffersize = buffersize
+        if logfilename is not None:
+            if not (appendlogfile and os.path.exists(logfilename)):
+                open(logfilename,'w').close() # create (or clear) file
+        if not verbose and logfilename is None: level = SILENT
+        self.level = level
+
+    def isenabled(self, level):
+        # check whether messages of a given level are written
+        return level<=self.level
+
+    def write(self, level, message, *args):
+        # write a message with a given level, formatted with the given arguments
+        if level>self.level: return
+        if len(args)>0:
+            message = message.format(*[arg() if callable(arg) else arg for arg in args])
+        if self.doprint: print(message)
+        if self.logname is not None:
+            self.buffer.append(message)
+            if len(self.buffer)>=self.buffersize: self.flush()
+
+    def result(self, message, *args):
+        self.write(RESULT, message, *args)
+
+    def info(self, message, *args):
+        self.write(INFO, message, *args)
+
+    def debug(self, message, *args):
+        self.write(DEBUG, message, *args)
+
+    def flush(self):
+        # write all buffered messages to the log file
+        if len(self.buffer)==0: return
+        with open(self.logname,'a') as logfile:
+            logfile.write('\n'.join(self.buffer)+'\n')
+        self.buffer = []
+
+    def __del__(self):
+        # make sure no messages are lost if flush was not called
+        try: self.flush()
+        except Exception: pass
@@ -0,0 +1,45 @@
+class TechniqueScheduler(object):
+    ### scheduler deciding in which order the solving techniques are tried
+    # each technique is a named step with a static cost estimate (in arbitrary units);
+    # the scheduler records the time spent and the number of candidates removed by each step
+    # and orders the steps by their expected time per removed candidate
+    # (see Sudoku.runtechniques, where after each productive step
+    #  the steps are tried again starting from the cheapest one)
+
+    def __init__(self, costs, prior=4):
+        ### initializer
+        # input arguments:
+        # - costs: dict mapping step names to static cost estimates,
+        #   used to order the steps as long as no statistics are available
+        # - prior: weight (in number of calls) of the static estimates
+        #   with respect to the measured statistics
+        self.costs = dict(costs)
+        self.prior = prior
+        self.calls = dict((name, 0) for name in costs)
+        self.time = dict((name, 0.) for name in costs)
+        self.removed = dict((name, 0) for name in costs)
+
+    def record(self, name, elapsed, removed):
+        # add the statistics of a single call of a step
+        self.calls[name] += 1
+        self.time[name] += elapsed
+        self.removed[name] += removed
+
+    def score(self, name, scale):
+        # expected time per removed candidate for a step,
+        # where the static cost estimate is converted to seconds using scale
+        # and counts as a number of prior calls removing one candidate each
+        if scale is None: return self.costs[name]
+        expectedtime = (self.prior*self.costs[name]*scale+self.time[name])
+        expectedremoved = (self.prior+self.removed[name])
+        return expectedtime/expectedremoved
+
+    def order(self, names):
+        # sort a list of step names from cheapest to most expensive
+        # the scale relating static cost estimates to seconds is estimated
+        # from all calls made so far (ties keep the given order)
+        totalcost = sum(self.costs[name]*self.calls[name] for name in self.costs)
+        totaltime = sum(self.time.values())
+        scale = None
+        if totalcost>0 and totaltime>0: scale = totaltime/totalcost
+        return sorted(names, key=lambda name: self.score(name, scale))
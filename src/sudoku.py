@@ -1,14 +1,127 @@
 # imports
 import numpy as np
-import itertools
-import copy as cp
 import sys
-import os
+import time
+import multiprocessing
+from collections import deque
+from topology import gettopology
+from dlx import DancingLinks
+from logger import Logger, DEBUG
+from scheduler import TechniqueScheduler
+from sudokustate import SudokuState
+from templates import gettemplates, gettemplateindex, maxsize as maxtemplatesize
+
+
+def masktolist(mask):
+    # convert a candidate bitmask to a sorted list of values
+    # (value v corresponds to bit number v, bit 0 is unused)
+    values = []
+    value = 0
+    while mask:
+        if mask & 1: values.append(value)
+        mask >>= 1
+        value += 1
+    return values
+
+def listtomask(values):
+    # convert a list of values to a candidate bitmask
+    mask = 0
+    for value in values: mask |= 1 << int(value)
+    return mask
+
+def popcount(mask):
+    # number of candidates in a candidate bitmask
+    return bin(mask).count('1')
+
+def packmasks(masks, width):
+    # pack a list of candidate bitmasks in a single integer,
+    # with bitmask number k shifted over k*width bits
+    # (width must be larger than the highest bit, i.e. size+1 for a sudoku of a given size)
+    packed = 0
+    for mask in reversed(masks): packed = (packed << width) | mask
+    return packed
+
+def unpackmasks(packed, width, n):
+    # convert an integer obtained from packmasks back to a list of n bitmasks
+    full = (1 << width)-1
+    return [(packed >> (k*width)) & full for k in range(n)]
+
+# solving steps used by solve_advanced and solve_hyperadvanced (see runtechniques),
+# with static cost estimates relative to a pass of the basic methods
+# (refined at runtime from the statistics kept by the TechniqueScheduler)
+advancedsteps = ['basic', 'lockedcandidates', 'nakedsubset', 'hiddensubset']
+hyperadvancedsteps = advancedsteps + ['xywing', 'uniquerectangle', 'skyscraper',
+                                      'twostringkite', 'swordfishcolumns', 'swordfishrows',
+                                      'xyzwing', 'simplecoloring', 'xchain', 'remotepair',
+                                      'xychain', 'templates']
+techniquecosts = {'basic': 1, 'lockedcandidates': 2, 'nakedsubset': 4, 'hiddensubset': 4,
+                  'xywing': 4, 'uniquerectangle': 4, 'skyscraper': 4, 'twostringkite': 4,
+                  'swordfishcolumns': 6, 'swordfishrows': 6, 'xyzwing': 6,
+                  'simplecoloring': 6, 'xchain': 10, 'remotepair': 4, 'xychain': 10,
+                  'templates': 10}
+
+_pools = {}
+
+def getpool(workers):
+    # get a (cached) process pool with a given number of worker processes
+    # (or None if no new processes can be started from the current process)
+    if multiprocessing.current_process().daemon: return None
+    if workers not in _pools: _pools[workers] = multiprocessing.Pool(workers)
+    return _pools[workers]
+
+def solvehypothesis(args):
+    # helper function for forcingchain, evaluated in a worker process:
+    # set a candidate in a cell of a sudoku given by its state and solve it
+    # (without forcing chain), returning the resulting candidate bitmasks
+    # packed in a single integer (see packmasks)
+    # (or None if the hypothesis leads to a contradiction)
+    (state, backend, autopropagate, row, column, value) = args
+    # (the state is unpickled for this call only, so it can be handed over)
+    S = sudokufromstate(state, backend=backend, autopropagate=autopropagate, share=True)
+    S.setcell(row, column, value)
+    S.solve(useforcingchain=False)
+    if not S.isvalid(): return None
+    return packmasks(S.masks, S.size+1)
+
+def sudokufromstate(state, backend='python', autopropagate=True, logger=None, scheduler=None,
+                    share=False):
+    # build a Sudoku object from a state (see Sudoku.snapshot) with a given configuration
+    # (the initializer is not called, so the counters are not recomputed)
+    # input arguments:
+    # - state: a SudokuState object
+    # - backend, autopropagate: see Sudoku.__init__
+    # - logger: Logger object to use (default: no logging)
+    # - scheduler: TechniqueScheduler object to use (default: a new one)
+    # - share: see Sudoku.restore
+    size = state.grid.shape[0]
+    S = Sudoku.__new__(Sudoku)
+    S.size = size
+    S.blocksize = int(np.sqrt(size))
+    S.topology = gettopology(size)
+    S.fullmask = listtomask(range(1,size+1))
+    S.backend = backend
+    S.autopropagate = autopropagate
+    S.propagating = False
+    S.trail = None
+    S.logger = logger if logger is not None else Logger(verbose=False)
+    S.contin = True
+    S.scheduler = scheduler if scheduler is not None else TechniqueScheduler(techniquecosts)
+    S.nsolutions = None
+    (S.fcmemo, S.fcbase, S.fccursor) = ({}, None, 0)
+    S.xymemo = (None, {})
+    S.restore(state, share=share)
+    return S
+
 
 class Sudoku(object):
     ### sudoku object with solving methods
+    # note: candidates are stored as one bitmask per cell in self.masks;
+    #       the candidates attribute is a copy built from these bitmasks,
+    #       so modifying it in place has no effect (assign a full new 3D-grid instead,
+    #       or use setcell and removecandidate)
 
-    def __init__(self,startgrid,verbose=True,logfilename=None,appendlogfile=False):
+    def __init__(self,startgrid,verbose=True,logfilename=None,appendlogfile=False,
+                 backend='python',autopropagate=True,loglevel=DEBUG):
         ### intializer: assign dimension, starting grid and other useful variables
         # input arguments:
         # - starting grid: a 2D square numpy array (dimension d), with values between 0 and d
@@ -18,6 +131,14 @@ class Sudoku(object):
         #   (same info as printed to screen if verbose is true) (default: no log file)
         # - appendlogfile: boolean whether to append to log file (if it exists) or overwrite it
         #   (ignored if logfilename is None)
+        # - backend: implementation of the basic solving methods, choose from
+        #   'python' (cell-by-cell loops) or 'numpy' (vectorized over the full grid);
+        #   note: the numpy backend packs candidate bitmasks in 64-bit integers,
+        #   so it supports grid sizes up to 62
+        # - autopropagate: boolean whether to immediately propagate the consequences
+        #   of each filled cell and removed candidate (see propagate)
+        # - loglevel: maximum level of messages to print and/or log
+        #   (see logger.py; if verbose is False and logfilename is None, nothing is logged)
 
         # check validity of starting grid
         if 'numpy.ndarray' not in str(type(startgrid)):
@@ -32,40 +153,113 @@ class Sudoku(object):
             print('ERROR: only proper squares are supported as grid size!')
             print('       Found shape '+str(startgrid.shape))
             sys.exit()
+        if backend not in ['python','numpy']:
+            print('ERROR: backend not recognized: '+str(backend))
+            sys.exit()
+        if backend=='numpy' and startgrid.shape[0]>62:
+            print('ERROR: numpy backend only supports grid sizes up to 62!')
+            print('       Found shape '+str(startgrid.shape))
+            sys.exit()
+        self.backend = backend
 
         # intialize grid properties
         self.size = startgrid.shape[0] # size of the square grid
         self.blocksize = int(np.sqrt(self.size)) # size of a single block
+        self.topology = gettopology(self.size) # precomputed group and peer index tables
         self.grid = startgrid.astype(int) # 2D-grid with values (0 means unfilled)
-        self.candidates = [] # 3D-grid with candidates for each cell
+        self.fullmask = listtomask(range(1,self.size+1)) # bitmask with all values as candidate
+        self.masks = [] # flat list of candidate bitmasks for each cell (index row*size+column)
         self.nunfilled = np.power(self.size,2) # number of unfilled cells in the grid (= 0 if solved)
         self.ncands = self.nunfilled*self.size # number of candidates (= number of cells if solved)
+        self.autopropagate = autopropagate
+        self.queue = deque() # pending (cell index, value, isplacement) events for propagate
+        self.propagating = False # flag to avoid recursive calls to propagate
+        self.trail = None # list of changes to undo during search (None if not recording)
+        self.stamp = 0 # number of changes to the candidates so far (see isdirty)
+        self.checkstamps = {} # value of stamp when each solving method last examined a unit
         for i in range(self.size):
-            self.candidates.append([])
             for j in range(self.size):
-                self.candidates[i].append([])
                 if self.grid[i,j] == 0:
-                    self.candidates[i][j] = list(range(1,self.size+1))
+                    self.masks.append(self.fullmask)
                 else:
-                    self.candidates[i][j] = [self.grid[i,j]]
+                    self.masks.append(1 << int(self.grid[i,j]))
                     self.nunfilled -= 1
                     self.ncands -= (self.size-1)
+                    if self.autopropagate: self.queue.append((i*self.size+j, int(self.grid[i,j]), True))
+        self.recount()
 
-        # intialize log file
-        self.doprint = verbose
-        self.dolog = False
-        self.logname = None
-        if logfilename is not None:
-            self.dolog = True
-            self.logname = logfilename # log file to keep track of solving procedure
-            if(appendlogfile and os.path.exists(logfilename)): 
-                self.logfile = open(self.logname,'a') # check if opening for appending works
-            else: 
-                self.logfile = open(self.logname,'w') # create file
-            self.logfile.close()
+        # intialize logger (printing and/or log file to keep track of solving procedure)
+        self.logger = Logger(verbose=verbose, logfilename=logfilename,
+                             appendlogfile=appendlogfile, level=loglevel)
 			
         # initialize flag used for aborting solving process
         self.contin = True
+
+        # initialize scheduler keeping track of the cost and yield of each solving step
+        self.scheduler = TechniqueScheduler(techniquecosts)
+
+        # number of solutions found by solve_dlx (None if not yet run)
+        self.nsolutions = None
+
+        # results of previous calls of forcingchain (see forcingchainmemo),
+        # the candidates at the time of the last call, and the cell where it resumes
+        self.fcmemo = {}
+        self.fcbase = None
+        self.fccursor = 0
+
+        # chains found by previous calls of xychain, and the cells with two candidates
+        # at the time (see xychainmemo)
+        self.xymemo = (None, {})
+
+    @property
+    def candidates(self):
+        # 3D-grid with candidates for each cell, built from the candidate bitmasks
+        # (compatibility accessor: modifying the returned lists has no effect on the sudoku)
+        return [[masktolist(self.masks[i*self.size+j]) for j in range(self.size)]
+                for i in range(self.size)]
+
+    @candidates.setter
+    def candidates(self, candidates):
+        # set the candidate bitmasks from a 3D-grid with candidates for each cell
+        self.masks = [listtomask(cands) for row in candidates for cands in row]
+        self.recount()
+        # (re)schedule all filled cells and missing candidates for propagation
+        self.queue.clear()
+        if not self.autopropagate: return
+        for index in range(len(self.masks)):
+            (row, column) = self.topology.coords[index]
+            if self.grid[row,column]!=0:
+                self.queue.append((index, int(self.grid[row,column]), True))
+            else:
+                for value in masktolist(self.fullmask & ~self.masks[index]):
+                    self.queue.append((index, value, False))
+
+    def getcandidatetensor(self):
+        # get boolean numpy array of shape (size,size,size)
+        # where element [i,j,k] is True if value k+1 is a candidate for cell (i,j)
+        # note: the bitmasks are converted to 64-bit integers, so size must be at most 62
+        if self.size>62:
+            print('ERROR: candidate tensor only supports grid sizes up to 62')
+            sys.exit()
+        masks = np.array(self.masks, dtype=np.int64).reshape(self.size,self.size)
+        values = np.arange(1,self.size+1)
+        return ((masks[:,:,np.newaxis] >> values) & 1).astype(bool)
+
+    def setcandidatetensor(self, tensor):
+        # modify the grid and candidates to match a boolean candidate tensor
+        # (see getcandidatetensor), using setcell and removecandidate
+        # note: the tensor is expected to contain a subset of the current candidates
+        values = np.arange(1,self.size+1)
+        masks = (tensor.astype(np.int64) << values).sum(axis=2).flatten()
+        for index in np.nonzero(masks!=np.array(self.masks, dtype=np.int64))[0]:
+            (row, column) = self.topology.coords[index]
+            mask = int(masks[index])
+            if self.grid[row,column]!=0: continue
+            toremove = self.masks[index] & ~mask
+            if popcount(mask)==1 and toremove:
+                self.setcell(row, column, mask.bit_length()-1)
+            else:
+                for value in masktolist(toremove): self.removecandidate(row, column, value)
 		
     def setbreak(self):
         # set continue parameter to false
@@ -77,22 +271,21 @@ class Sudoku(object):
 
     def writemessage(self,message):
         # write a message to log file and/or stdout
-        if self.dolog:
-            self.logfile = open(self.logname,'a')
-            self.logfile.write(message+'\n')
-            self.logfile.close()
-        if self.doprint:
-            print(message)
-
-    def copy(self,logfilename=None,appendlogfile=False):
+        # (kept for compatibility, use self.logger for level-based and lazy logging)
+        self.logger.debug(message)
+
+    def copy(self,logfilename=None,appendlogfile=False,verbose=None):
         # make a deep copy of a sudoku grid
-        # potentially with different log file
-        S = Sudoku(np.zeros((self.size,self.size)),verbose=self.doprint,logfilename=logfilename,
-                    appendlogfile=appendlogfile)
-        S.grid = np.copy(self.grid)
-        S.candidates = cp.deepcopy(self.candidates)
-        S.nunfilled = self.nunfilled
-        S.ncands = self.ncands
+        # potentially with different log file and verbosity (default: same as self)
+        # (the initializer is not called: the configuration is copied
+        #  and the state is taken over from a snapshot, see sudokufromstate)
+        if verbose is None: verbose = self.logger.doprint
+        logger = Logger(verbose=verbose, logfilename=logfilename,
+                        appendlogfile=appendlogfile, level=self.logger.level)
+        # (the statistics of the scheduler are shared)
+        S = sudokufromstate(self.snapshot(), backend=self.backend,
+                            autopropagate=self.autopropagate, logger=logger,
+                            scheduler=self.scheduler, share=True)
         S.contin = self.contin
         return S
 
@@ -100,44 +293,55 @@ class Sudoku(object):
         # set self to a deepcopy of S (log file is shared)
         self.size = S.size
         self.blocksize = S.blocksize
-        self.grid = S.grid.astype(int)
-        self.candidates = [[[int(x) for x in col] for col in row] for row in S.candidates]
-        self.nunfilled = S.nunfilled
-        self.ncands = S.ncands
-        self.doprint = S.doprint
-        self.dolog = S.dolog
-        self.logname = S.logname
+        self.topology = S.topology
+        self.fullmask = S.fullmask
+        self.autopropagate = S.autopropagate
+        self.logger = S.logger
+        self.scheduler = S.scheduler
+        self.backend = S.backend
+        (self.fcmemo, self.fcbase, self.fccursor) = ({}, None, 0)
+        self.xymemo = (None, {})
+        self.restore(S.snapshot(), share=True)
+
+    def snapshot(self):
+        # get a copy of the current state (grid, candidates and counters)
+        # that can be restored later on, see sudokustate.py
+        return SudokuState(self)
+
+    def restore(self, state, share=False):
+        # restore a state obtained from snapshot
+        # (a state can be restored any number of times, unless share is True,
+        #  in which case it is handed over without copying, see SudokuState.apply)
+        # note: this does not record anything in the trail, so it should not be used
+        #       during solvebruteforce (which uses undo instead)
+        state.apply(self, share=share)
         
     def getgrid(self):
         # get copy of grid for read-only purposes
         return np.copy(self.grid)
     
     def getrow(self, index):
-        # get copy of row at position 'index'
+        # get copy of values and candidate bitmasks of row at position 'index'
         # numbering convention: from 0 until self.size (not included), from top to bottom
         if index<0 or index>self.size:
             print('ERROR: getrow function got unexpected index: '+str(index))
             sys.exit()
-        res1 = []; res2 = []
-        for i in range(self.size):
-            res1.append(self.grid[index,i])
-            res2.append(self.candidates[index][i])
+        res1 = self.grid[index,:].tolist()
+        res2 = [self.masks[k] for k in self.topology.rows[index]]
         return (res1,res2)
     
     def getcolumn(self, index):
-        # get copy of column at position 'index'
+        # get copy of values and candidate bitmasks of column at position 'index'
         # numbering convention: from 0 until self.size (not included), from left to right
         if index<0 or index>self.size:
             print('ERROR: getcolumn function got unexpected index: '+str(index))
             sys.exit()
-        res1 = []; res2 = []
-        for i in range(self.size):
-            res1.append(self.grid[i,index])
-            res2.append(self.candidates[i][index])
+        res1 = self.grid[:,index].tolist()
+        res2 = [self.masks[k] for k in self.topology.columns[index]]
         return (res1,res2)
     
     def getblock(self, index1, index2=None):
-        # get copy of block
+        # get copy of values and candidate bitmasks of block
         # case 1: index2 == None: index1 is global block index
         # numbering convention: from 0 until self.size (not included), in reading order
         # case 2: index2 is not None: index1 and index2 are global grid indices
@@ -145,24 +349,17 @@ class Sudoku(object):
           or (index2 is not None and index2>self.size)):
             print('ERROR: getblock function got unexpected index: '+str(index1)+','+str(index2)+')')
             sys.exit()
-        if index2==None:
-            (row,column) = divmod(index1,self.blocksize)
-        else:
-            row = divmod(index1,self.blocksize)[0]
-            column = divmod(index2,self.blocksize)[0]
-        res1 = []; res2 = []
-        for i in range(self.blocksize*row,self.blocksize*(row+1)):
-            for j in range(self.blocksize*column,self.blocksize*(column+1)):
-                res1.append(self.grid[i,j])
-                res2.append(self.candidates[i][j])
+        if index2 is not None:
+            index1 = self.topology.cellblock[index1*self.size+index2]
+        cells = self.topology.blocks[index1]
+        (row,column) = self.topology.coords[cells[0]]
+        res1 = self.grid[row:row+self.blocksize,column:column+self.blocksize].flatten().tolist()
+        res2 = [self.masks[k] for k in cells]
         return (res1,res2)
     
     def getblockindex(self,row,column):
         # get global block index from cell position (row,column)
-        blockrow = divmod(row,self.blocksize)[0]
-        blockcolumn = divmod(column,self.blocksize)[0]
-        blockindex = self.blocksize*blockrow+blockcolumn
-        return blockindex
+        return self.topology.cellblock[row*self.size+column]
     
     def getgroup(self,label,index,index2=None):
         # generalization of getrow, getcolumn and getblock, useful in looping functions
@@ -178,18 +375,8 @@ class Sudoku(object):
     
     def getcell(self,grouptype,groupindex,localindex):
         # get cell indices of element number 'localindex' of group number 'groupindex' of type 'grouptype'
-        if grouptype=='row':
-            rowindex = groupindex
-            columnindex = localindex
-            return (rowindex,columnindex)
-        if grouptype=='column':
-            rowindex = localindex
-            columnindex = groupindex
-            return (rowindex,columnindex)
-        if grouptype=='block':
-            rowindex = divmod(groupindex,self.blocksize)[0]*self.blocksize+divmod(localindex,self.blocksize)[0]
-            columnindex = divmod(groupindex,self.blocksize)[1]*self.blocksize+divmod(localindex,self.blocksize)[1]
-            return (rowindex,columnindex)
+        if grouptype in self.topology.groupcoords:
+            return self.topology.groupcoords[grouptype][groupindex][localindex]
         print('ERROR: grouptype parameter in getcell function not recognized, found '+str(grouptype))
         
     def setcell(self,rowindex,columnindex,value):
@@ -198,51 +385,213 @@ class Sudoku(object):
             return (self.nunfilled, self.ncands)
             # to find out where this is used,
             # maybe raise warning or exception instead?
+        index = rowindex*self.size+columnindex
+        if self.trail is not None: self.trail.append((index, self.masks[index], True))
         self.nunfilled -= 1
         self.grid[rowindex, columnindex] = value
-        self.ncands -= len(self.candidates[rowindex][columnindex])-1
-        self.candidates[rowindex][columnindex] = [value]
+        value = int(value)
+        removed = self.masks[index] & ~(1 << value)
+        self.ncands -= popcount(self.masks[index])-1
+        self.updatecounts(index, self.masks[index], 1 << value, 0, value)
+        self.masks[index] = 1 << value
+        if self.autopropagate:
+            self.queue.append((index, value, True))
+            for cand in masktolist(removed): self.queue.append((index, cand, False))
+            self.propagate()
         return (self.nunfilled, self.ncands)
     
     def removecandidate(self, rowindex, columnindex, value):
         # remove a candidate (if present) and modify counters
-        if value not in self.candidates[rowindex][columnindex]:
+        index = rowindex*self.size+columnindex
+        mask = self.masks[index]
+        if not (mask >> value) & 1:
             return (self.nunfilled, self.ncands)
             # to find out where this is used,
             # maybe raise warning or exception instead?
         # remove candidate
-        self.candidates[rowindex][columnindex].remove(value)
+        if self.trail is not None: self.trail.append((index, mask, False))
+        self.updatecounts(index, mask, mask & ~(1 << int(value)), 0, 0)
+        mask &= ~(1 << int(value))
+        self.masks[index] = mask
         self.ncands -= 1
+        if self.autopropagate: self.queue.append((index, int(value), False))
         # if only one candidate remains for the current cell, fill it
-        if len(self.candidates[rowindex][columnindex])==1:
-            candidate = self.candidates[rowindex][columnindex][0]
+        if mask and not (mask & (mask-1)):
+            candidate = mask.bit_length()-1
             return self.setcell(rowindex, columnindex, candidate)
+        if self.autopropagate: self.propagate()
+        return (self.nunfilled, self.ncands)
+
+    def propagate(self):
+        # process the queue of pending events created by setcell and removecandidate
+        # (only used if autopropagate is True):
+        # - a cell was filled: remove its value from the candidates of all its peers
+        #   (this solving method is also known as 'sole candidate')
+        # - a candidate was removed from a cell: if in one of the groups of this cell
+        #   only one position for this value remains, fill it
+        #   (this solving method is also known as 'unique candidate')
+        # note: the work done is proportional to the number of changes,
+        #       as opposed to the full-grid sweeps of reducecandidates and complement
+        if self.propagating: return
+        self.propagating = True
+        topology = self.topology
+        try:
+            while len(self.queue)>0:
+                (index, value, isplacement) = self.queue.popleft()
+                bit = 1 << value
+                if isplacement:
+                    for peer in topology.peers[index]:
+                        if not self.masks[peer] & bit: continue
+                        (row, column) = topology.coords[peer]
+                        if self.grid[row,column]!=0: continue
+                        self.removecandidate(row, column, value)
+                else:
+                    for group in topology.cellgroups[index]:
+                        positions = [k for k in group if self.masks[k] & bit]
+                        if len(positions)!=1: continue
+                        (row, column) = topology.coords[positions[0]]
+                        if self.grid[row,column]==0: self.setcell(row, column, value)
+        finally:
+            # make sure propagation is not left disabled if an exception occurs
+            self.propagating = False
     
+    def undo(self, position):
+        # revert all changes recorded in the trail after the given position
+        # (see solvebruteforce), restoring the grid, candidates and counters
+        while len(self.trail)>position:
+            (index, mask, isplacement) = self.trail.pop()
+            value = 0
+            if isplacement:
+                (row, column) = self.topology.coords[index]
+                value = int(self.grid[row,column])
+                self.grid[row,column] = 0
+                self.nunfilled += 1
+            self.ncands += popcount(mask)-popcount(self.masks[index])
+            self.updatecounts(index, self.masks[index], mask, value, 0)
+            self.masks[index] = mask
+        # pending events refer to the reverted state
+        self.queue.clear()
+
+    def recount(self):
+        # (re)compute the counters used by isvalid from the grid and candidate bitmasks:
+        # for each unit (see topology.units) and each value (index unit*(size+1)+value):
+        # - placedcounts: number of cells in the unit filled with the value
+        # - positioncounts: number of cells in the unit with the value as candidate
+        # and the number of conflicts, i.e. the number of (unit, value) pairs with
+        # a value filled more than once or without position, plus the number of empty cells;
+        # also the set of indices of cells with exactly two candidates (bivalue cells),
+        # the set of links between them (see getbivaluegraph)
+        # and the set of indices of (unit, value) pairs with exactly two positions
+        # (candidates for strong links, see getstronglinks)
+        # (these counters are kept up to date by setcell, removecandidate and undo);
+        # all units and values are marked as modified (see isdirty)
+        n = self.size
+        self.stamp += 1
+        self.unitstamps = [self.stamp]*(3*n)
+        self.valuestamps = [self.stamp]*(n+1)
+        self.placedcounts = [0]*(3*n*(n+1))
+        self.positioncounts = [0]*(3*n*(n+1))
+        for unit, cells in enumerate(self.topology.units):
+            for index in cells:
+                (row, column) = self.topology.coords[index]
+                if self.grid[row,column]!=0:
+                    self.placedcounts[unit*(n+1)+int(self.grid[row,column])] += 1
+                for value in masktolist(self.masks[index]):
+                    self.positioncounts[unit*(n+1)+value] += 1
+        self.nconflicts = self.masks.count(0)
+        self.bivalues = set(index for index, mask in enumerate(self.masks) if popcount(mask)==2)
+        ncells = self.topology.ncells
+        self.bivaluelinks = set(index*ncells+other for index in self.bivalues
+                                for other in self.topology.peers[index]
+                                if other>index and other in self.bivalues
+                                and self.masks[index] & self.masks[other])
+        self.stronglinks = set(key for key, count in enumerate(self.positioncounts) if count==2)
+        for unit in range(3*n):
+            for value in range(1,n+1):
+                if self.placedcounts[unit*(n+1)+value]>1: self.nconflicts += 1
+                if self.positioncounts[unit*(n+1)+value]==0: self.nconflicts += 1
+
+    def updatecounts(self, index, oldmask, newmask, oldvalue, newvalue):
+        # update the counters of recount for a change of the candidate bitmask of a cell
+        # and/or the value filled in it (0 for unfilled),
+        # and mark the units of the cell and the changed values as modified (see isdirty)
+        placedcounts = self.placedcounts
+        positioncounts = self.positioncounts
+        self.stamp += 1
+        for unit in self.topology.cellunits[index]: self.unitstamps[unit] = self.stamp
+        units = [unit*(self.size+1) for unit in self.topology.cellunits[index]]
+        self.valuestamps[oldvalue] = self.stamp
+        self.valuestamps[newvalue] = self.stamp
+        for value in masktolist(oldmask & ~newmask):
+            self.valuestamps[value] = self.stamp
+            for unit in units:
+                positioncounts[unit+value] -= 1
+                if positioncounts[unit+value]==0: self.nconflicts += 1
+                elif positioncounts[unit+value]==2: self.stronglinks.add(unit+value)
+                elif positioncounts[unit+value]==1: self.stronglinks.discard(unit+value)
+        for value in masktolist(newmask & ~oldmask):
+            self.valuestamps[value] = self.stamp
+            for unit in units:
+                if positioncounts[unit+value]==0: self.nconflicts -= 1
+                positioncounts[unit+value] += 1
+                if positioncounts[unit+value]==2: self.stronglinks.add(unit+value)
+                elif positioncounts[unit+value]==3: self.stronglinks.discard(unit+value)
+        if oldmask==0 and newmask!=0: self.nconflicts -= 1
+        if newmask==0 and oldmask!=0: self.nconflicts += 1
+        if oldvalue!=0:
+            for unit in units:
+                if placedcounts[unit+oldvalue]==2: self.nconflicts -= 1
+                placedcounts[unit+oldvalue] -= 1
+        if newvalue!=0:
+            for unit in units:
+                placedcounts[unit+newvalue] += 1
+                if placedcounts[unit+newvalue]==2: self.nconflicts += 1
+        if popcount(oldmask)==2:
+            self.bivalues.discard(index)
+            for other in self.topology.peers[index]:
+                if other in self.bivalues: self.bivaluelinks.discard(self.linkkey(index, other))
+        if popcount(newmask)==2:
+            for other in self.topology.peers[index]:
+                if other in self.bivalues and self.masks[other] & newmask:
+                    self.bivaluelinks.add(self.linkkey(index, other))
+            self.bivalues.add(index)
+
+    def linkkey(self, index1, index2):
+        # key of the link between two cells in self.bivaluelinks (independent of the order)
+        if index1>index2: (index1, index2) = (index2, index1)
+        return index1*self.topology.ncells+index2
+
+    def isdirty(self, key, units, stamp=None, values=[]):
+        # check whether a solving method must (re)examine a part of the grid, i.e. whether
+        # any of the given units (see topology.units) or values was modified
+        # since it was last examined, and mark it as examined at the given stamp (default: now)
+        # input arguments:
+        # - key: hashable identifying the solving method and the part of the grid
+        # - units: list of units on which the result of the method depends,
+        #   i.e. the units it reads candidates from and removes candidates from
+        # - stamp: value of self.stamp at the time the candidates were read
+        # - values: list of values on which the result of the method depends,
+        #   i.e. whose positions (candidates and filled cells) in the whole grid it reads
+        #   (for methods working on a single value at a time, such as fish)
+        # note: this is only valid if all results found at the previous examination
+        #       were applied, so it should not be used when only returning hints
+        if stamp is None: stamp = self.stamp
+        checked = self.checkstamps.get(key)
+        self.checkstamps[key] = stamp
+        if checked is None: return True
+        for unit in units:
+            if self.unitstamps[unit]>checked: return True
+        for value in values:
+            if self.valuestamps[value]>checked: return True
+        return False
+
     def isvalid(self):
-        # check if a sudoku grid does not contain contradictions so far; 
-        # zeros (unfilled cells) are ignored.
-        for i in range(self.size):
-            if not self.groupisvalid(self.getrow(i)[0]):
-                return False
-            if not self.groupisvalid(self.getcolumn(i)[0]):
-                return False
-            if not self.groupisvalid(self.getblock(i)[0]):
-                return False
-        return True
+        # check if a sudoku grid does not contain contradictions so far, i.e.
+        # no value filled twice in a row, column or block, no cell without candidates
+        # and no value without possible position in a row, column or block
+        # (uses the counters of recount, so this does not loop over the grid)
+        return self.nconflicts==0
             
-    def groupisvalid(self,group):
-        # help function for isvalid; check if a group does not contain any contradictions; 
-        # zeros are ignored.
-        containslist = []
-        for i in group:
-            if i == 0:
-                continue
-            if i in containslist:
-                return False
-            else:
-                containslist.append(i)
-        return True
-
     def issolved(self):
         # check if a sudoku is solved
         return (self.isvalid() and self.nunfilled==0)
@@ -257,24 +606,26 @@ class Sudoku(object):
         # input arguments:
         # - solve: boolean whether to modify the grid or only return hint
         
-        #if verbose: self.writemessage('Running basic reduction method...')
+        #if verbose: self.logger.debug('Running basic reduction method...')
         res = []
         # loop over rows and columns in the grid
         for i in range(self.size):
             for j in range(self.size):
                 # skip already filled cells
                 if self.grid[i][j] != 0: continue
+                index = i*self.size+j
                 # loop over all groups (row, column, block)
                 # that this cell belongs to
-                row = self.getrow(i)[0]
-                col = self.getcolumn(j)[0]
-                block = self.getblock(i,j)[0]
-                for k, group in enumerate([row, col, block]):
+                groups = [self.grid.take(groupcells).tolist()
+                          for groupcells in self.topology.cellgroups[index]]
+                for k, group in enumerate(groups):
+                    # skip groups that do not share any number with the candidates
+                    if not self.masks[index] & listtomask(group): continue
                     # for each number in the group,
                     # if it is also a candidate in the current cell,
                     # that candidate can be removed
                     for number in group:
-                        if number in self.candidates[i][j]:
+                        if number and (self.masks[index] >> number) & 1:
                             groupname = ['row', 'column', 'block'][k]
                             res.append({'method': 'reducecandidates',
                                         'infokeys': ['cell', 'label', 'value'],
@@ -284,7 +635,7 @@ class Sudoku(object):
                             if solve: self.removecandidate(i, j, number)
         #if verbose:
         #    msg = '{} candidates were removed by basic reduction.'.format(len(res))
-        #    self.writemessage(msg)
+        #    self.logger.debug(msg)
         return res
                     
     def loopgroups(self, groupfunctions,
@@ -307,13 +658,20 @@ class Sudoku(object):
                 print(msg)
                 labels.remove(label)
         res = []
+        unitoffsets = {'row': 0, 'column': self.size, 'block': 2*self.size}
         # loop over all groups
         for i in range(self.size):
             for label in labels:
+                # when solving, skip the functions for which the group was not modified
+                # since they were last called on it (all of them only act within the group)
+                unit = unitoffsets[label]+i
+                functions = groupfunctions
+                if solve: functions = [f for f in groupfunctions if self.isdirty((f, unit), [unit])]
+                if len(functions)==0: continue
                 group, cands = self.getgroup(label, i)
                 args = [group, i, label, cands]
                 # loop over al functions to be called on each group
-                for f in groupfunctions:
+                for f in functions:
                     # part 1: functions applicable to all groups
                     if f=='complement':
                         res += self.complement(*args, solve=solve, verbose=verbose)
@@ -321,27 +679,13 @@ class Sudoku(object):
                         res += self.nakedsubset(*args, solve=solve, verbose=verbose)
                     elif f=='hiddensubset':
                         res += self.hiddensubset(*args, solve=solve, verbose=verbose)
-                    # part 2: functions applicable to rows and columns
-                    elif f=='lineblockinteraction': 
-                        if label in ['row','column']:
-                            res += self.lineblockinteraction(*args, solve=solve, verbose=verbose)
-                    # part 3: functions applicable to blocks
-                    elif f=='blocklineinteraction': 
-                        if label=='block':
-                            res += self.blocklineinteraction(*args, solve=solve, verbose=verbose)
-                    elif f=='blockblockinteraction':
-                        if label=='block':
-                            res += self.blockblockhorizontalinteraction(*args,
-                                    solve=solve, verbose=verbose)
-                            res += self.blockblockverticalinteraction(*args,
-                                    solve=solve, verbose=verbose)
                     else:
                         msg = 'WARNING: groupfunction "{}" not recognized,'.format(f)
                         msg += ' skipping it.'
                         print(msg)
         return res
                 
-    def complement(self, group, groupindex, label, candidates, solve=True, verbose=False):
+    def complement(self, group, groupindex, label, masks, solve=True, verbose=False):
         # BASIC solving method (group-based)
         # if only one possible position for an element is present within a group, 
         # fill this position with this element
@@ -349,7 +693,7 @@ class Sudoku(object):
         # input arguments:
         # - solve: boolean whether to modify the grid or only return hint
         
-        #if verbose: self.writemessage('Running basic complement method...')
+        #if verbose: self.logger.debug('Running basic complement method...')
         res = []
         # loop over all elements to be filled in the group
         for el in range(1,self.size+1):
@@ -358,7 +702,7 @@ class Sudoku(object):
             # find all positions where the element is a candidate
             pos = []
             for j in range(self.size):
-                if el in candidates[j]: pos.append(j)
+                if (masks[j] >> el) & 1: pos.append(j)
             # if only one position, fill it with this element
             if len(pos)==1:
                 (row, column) = self.getcell(label, groupindex, pos[0])
@@ -369,645 +713,1145 @@ class Sudoku(object):
                             'value': el})
                 if solve: self.setcell(row, column, el)
                 if verbose:
-                    msg = 'Cell ({},{}) was filled'.format(row, column)
-                    msg += ' using basic {} complementing.'.format(label)
-                    self.writemessage(msg)
+                    self.logger.debug('Cell ({},{}) was filled using basic {} complementing.',
+                                      row, column, label)
         #if verbose and len(res)==0:
         #    msg = '(No cells could be filled using basic {} complementing.)'.format(label)
-        #    self.writemessage(msg)
+        #    self.logger.debug(msg)
         return res
 
 
-    def issubset(self, smalllist, biglist):
+    def findsubsets(self, items, maxsize):
         # help function for nakedsubset and hiddensubset
-        # return values:
-        #   -1: not a single element of smalllist in biglist
-        #   0: some but not all elements of smalllist in biglist
-        #   1: all elements of smalllist in biglist
-        nels = 0
-        for el in smalllist:
-            if el in biglist:
-                nels += 1
-        if nels==0: return -1
-        if nels==len(smalllist): return 1
-        return 0
+        # find all combinations of at least 2 items (given as bitmasks)
+        # of which the union contains as many bits as there are items in the combination,
+        # considering only unions of at most maxsize bits;
+        # the combinations are built by a depth-first search adding one item at a time,
+        # so that a branch is pruned as soon as its union gets too large
+        # returns:
+        #   a list of (indices of the items, union bitmask) tuples
+        items = [(k, item) for k, item in enumerate(items) if item and popcount(item)<=maxsize]
+        res = []
+        stack = [(0, [], 0)] # (next position in items, chosen item indices, union)
+        while len(stack)>0:
+            (start, chosen, union) = stack.pop()
+            for pos in range(start, len(items)):
+                (k, item) = items[pos]
+                newunion = union | item
+                nbits = popcount(newunion)
+                if nbits>maxsize: continue
+                newchosen = chosen+[k]
+                # not enough items left to match the number of bits in the union
+                if nbits-len(newchosen) > len(items)-pos-1: continue
+                if len(newchosen)==nbits and nbits>=2: res.append((newchosen, newunion))
+                if len(newchosen)<maxsize: stack.append((pos+1, newchosen, newunion))
+        return res
 
-    def allsubsets(self, candidates):
+    def emptycells(self, masks):
         # help function for nakedsubset and hiddensubset
-        # returns:
-        #   a list of all subsets built from all candidates in a group
-
-        # make a list of unique candidates
-        # in all cells that are not already filled
-        allcands = []
-        for candset in candidates:
-            if len(candset)<2: continue
-            allcands += candset
-        uniquecands = list(set(allcands))
-        # build all possible subsets of all unique candidates
-        subsets = list(itertools.combinations(uniquecands, 2))
-        for j in range(3, len(uniquecands)+1):
-            toappend = list(itertools.combinations(uniquecands, j))
-            for subset in toappend: subsets.append(subset)
-        return subsets
-
-    def nakedsubset(self, group, groupindex, label, candidates, solve=True, verbose=False):
+        # returns the indices of the cells in a group that have two or more candidates
+        return [j for j in range(self.size) if popcount(masks[j])>=2]
+
+    def nakedsubset(self, group, groupindex, label, masks, solve=True, verbose=False):
         # ADVANCED method (group-based)
         # if n candidate sets together contain only a set of n numbers, 
         # remove those numbers from all other candidate sets in the group
+        # note: only subsets of up to half the number of cells with two or more candidates
+        #       are considered, since a larger naked subset corresponds to
+        #       a smaller hidden subset in the other cells (see hiddensubset)
         # input arguments:
         # - solve: boolean whether to modify the grid or only return hint
         
-        #if verbose: self.writemessage('Searching for naked subsets...')
+        #if verbose: self.logger.debug('Searching for naked subsets...')
         res = []
-        # loop over all subsets of candidates in the group
-        subsets = self.allsubsets(candidates)
-        for subset in subsets:
-            # find the cells of which all candidates belong to this subset
-            setindices = []
-            for j in range(self.size):
-                sub = self.issubset(candidates[j], subset)
-                if sub==1: setindices.append(j)
-            # if there are n cells with all candidates belonging to the subset,
+        empty = self.emptycells(masks)
+        found = []
+        for (items, submask) in self.findsubsets([masks[j] for j in empty], len(empty)//2):
+            found.append((masktolist(submask), [empty[k] for k in items], submask))
+        # loop over all subsets in order of increasing size
+        for (subset, setindices, submask) in sorted(found):
             # remove all candidates in the subset from all other cells
-            if(len(subset)==len(setindices)):
-                useful = False
-                for k in range(self.size):
-                    if k in setindices: continue
-                    (row, column) = self.getcell(label, groupindex, k)
-                    for cand in subset:
-                        if cand in self.candidates[row][column]: useful = True
-                        if solve: self.removecandidate(row, column, cand)
-                if useful:
-                    cells = []
-                    for s in setindices: cells.append(self.getcell(label, groupindex, s))
-                    res.append({'method': 'nakedsubset',
-                                'infokeys': ['grouplabel','groupindex','indices','values','cells'],
-                                'grouplabel':label, 'groupindex':groupindex,
-                                'indices':setindices, 'values':subset, 'cells':cells})
-                    if verbose: self.writemessage('Found naked subset in cells '+str(cells))
-        #if verbose and len(res)==0: self.writemessage('(no naked subsets found.)')
+            useful = False
+            for k in range(self.size):
+                if k in setindices: continue
+                (row, column) = self.getcell(label, groupindex, k)
+                toremove = self.masks[row*self.size+column] & submask
+                if not toremove: continue
+                useful = True
+                if solve:
+                    for cand in masktolist(toremove): self.removecandidate(row, column, cand)
+            if useful:
+                cells = []
+                for s in setindices: cells.append(self.getcell(label, groupindex, s))
+                res.append({'method': 'nakedsubset',
+                            'infokeys': ['grouplabel','groupindex','indices','values','cells'],
+                            'grouplabel':label, 'groupindex':groupindex,
+                            'indices':setindices, 'values':tuple(subset), 'cells':cells})
+                if verbose: self.logger.debug('Found naked subset in cells {}', cells)
+        #if verbose and len(res)==0: self.logger.debug('(no naked subsets found.)')
         return res
 
-    def hiddensubset(self, group, groupindex, label, candidates, solve=True, verbose=False):
+    def hiddensubset(self, group, groupindex, label, masks, solve=True, verbose=False):
         # ADVANCED method (group-based)
         # if a subset of n candidates is shared between exactly n cells, 
         # remove all other candidates from these cells
+        # note: only subsets of up to half the number of cells with two or more candidates
+        #       are considered, see nakedsubset
         # input arguments:
         # - solve: boolean whether to modify the grid or only return hint
         
-        #if verbose: self.writemessage('Searching for hidden subsets...')
+        #if verbose: self.logger.debug('Searching for hidden subsets...')
         res = []
-        # loop over all subsets of candidates in the group
-        subsets = self.allsubsets(candidates)
-        for subset in subsets:
-            # find cells where this subset is (at least partially) present
-            shareindices = []
-            for j in range(self.size):
-                sub = self.issubset(subset, candidates[j])
-                if(sub==0 or sub==1): shareindices.append(j)
-            # if a subset of size n is shared by n cells,
-            # remove all other candidates from these cells
-            if(len(subset)==len(shareindices)):
-                useful = False
-                for k in shareindices:
-                    (row, column) = self.getcell(label, groupindex, k)
-                    for cand in range(1, self.size+1):
-                        if cand in subset: continue
-                        if cand in self.candidates[row][column]: useful = True
-                        if solve: self.removecandidate(row, column, cand)
-                if useful:
-                    cells = []
-                    for s in shareindices: cells.append(self.getcell(label, groupindex, s))
-                    res.append({'method': 'hiddensubset',
-                                'infokeys': ['grouplabel','groupindex','indices','values','cells'],
-                                'grouplabel':label, 'groupindex':groupindex,
-                                'indices':shareindices, 'values':subset, 'cells':cells})
-                    if verbose: self.writemessage('Found hidden subset in cells '+str(cells))
-        #if verbose and len(res)==0: self.writemessage('(no hidden subsets found.)')
+        empty = self.emptycells(masks)
+        allcands = 0
+        for j in empty: allcands |= masks[j]
+        values = masktolist(allcands)
+        # for each value, make a bitmask of the positions in the group where it is a candidate
+        positions = []
+        for value in values:
+            positions.append(listtomask([j for j in range(self.size) if (masks[j] >> value) & 1]))
+        found = []
+        for (items, posmask) in self.findsubsets(positions, len(empty)//2):
+            found.append(([values[k] for k in items], masktolist(posmask)))
+        # loop over all subsets in order of increasing size
+        for (subset, shareindices) in sorted(found):
+            submask = listtomask(subset)
+            # remove all other candidates from the cells sharing the subset
+            useful = False
+            for k in shareindices:
+                (row, column) = self.getcell(label, groupindex, k)
+                toremove = self.masks[row*self.size+column] & ~submask
+                if not toremove: continue
+                useful = True
+                if solve:
+                    for cand in masktolist(toremove): self.removecandidate(row, column, cand)
+            if useful:
+                cells = []
+                for s in shareindices: cells.append(self.getcell(label, groupindex, s))
+                res.append({'method': 'hiddensubset',
+                            'infokeys': ['grouplabel','groupindex','indices','values','cells'],
+                            'grouplabel':label, 'groupindex':groupindex,
+                            'indices':shareindices, 'values':tuple(subset), 'cells':cells})
+                if verbose: self.logger.debug('Found hidden subset in cells {}', cells)
+        #if verbose and len(res)==0: self.logger.debug('(no hidden subsets found.)')
         return res
                    
-    def blocklineinteraction(self, block, blockindex, label, blockcands,
-            solve=True, verbose=False):
-        # ADVANCED solving method (block-based)
-        # if a candidate occurs in only one row/column within a block, 
-        # remove it from the rest of the row/column
+    def getintersectionmasks(self):
+        # help function for lockedcandidates
+        # returns:
+        #   two dicts (blockboards, lineboards) keyed by line label 'row' or 'column',
+        #   each holding a list of lists of bitmasks, where
+        #   blockboards[label][value][block] has bit number k set if value is a candidate
+        #   in the k-th line crossing the block (see topology.blocklines)
+        #   and lineboards[label][value][line] has bit number k set if value is a candidate
+        #   in the k-th block crossing the line (see topology.lineblocks),
+        #   only considering unfilled cells;
+        #   blocks and lines in which the value is already filled get bitmask 0
+        n = self.size
+        b = self.blocksize
+        topology = self.topology
+        blockboards = {'row': [[0]*n for value in range(n+1)],
+                       'column': [[0]*n for value in range(n+1)]}
+        lineboards = {'row': [[0]*n for value in range(n+1)],
+                      'column': [[0]*n for value in range(n+1)]}
+        blockrows = blockboards['row']
+        blockcolumns = blockboards['column']
+        rowblocks = lineboards['row']
+        columnblocks = lineboards['column']
+        filled = []
+        for index in range(topology.ncells):
+            (row, column) = topology.coords[index]
+            block = topology.cellblock[index]
+            if self.grid[row,column]!=0:
+                filled.append((row, column, block, int(self.grid[row,column])))
+                continue
+            (rowbit, columnbit) = (1 << (row%b), 1 << (column%b))
+            (rowblockbit, columnblockbit) = (1 << (column//b), 1 << (row//b))
+            for value in masktolist(self.masks[index]):
+                blockrows[value][block] |= rowbit
+                blockcolumns[value][block] |= columnbit
+                rowblocks[value][row] |= rowblockbit
+                columnblocks[value][column] |= columnblockbit
+        for (row, column, block, value) in filled:
+            blockrows[value][block] = 0
+            blockcolumns[value][block] = 0
+            rowblocks[value][row] = 0
+            columnblocks[value][column] = 0
+        return (blockboards, lineboards)
+
+    def lockedcandidates(self, methods=None, solve=True, verbose=False):
+        # ADVANCED solving method (grid-based)
+        # all eliminations based on the intersections of blocks and lines,
+        # found in a single sweep over the positions of each value in each block and line:
+        # - blocklineinteraction: if a candidate occurs in only one row/column within a block,
+        #   remove it from the rest of the row/column
+        # - lineblockinteraction: if a candidate occurs in only one block within a row/column,
+        #   remove it from the rest of the block
+        # - blockblockinteraction: if a candidate occurs in only two rows (columns)
+        #   in two horizontally (vertically) aligned blocks,
+        #   remove it from the remaining positions in those rows (columns)
         # input arguments:
+        # - methods: list of the above method names to apply (default: all of them)
         # - solve: boolean whether to modify the grid or only return hint
-        
-        #if verbose: self.writemessage('Searching for block-line interactions...')
+        # note: the positions are determined once at the start;
+        #       eliminations can only remove positions, so the patterns remain valid
+        allmethods = ['blocklineinteraction','lineblockinteraction','blockblockinteraction']
+        if methods is None: methods = allmethods
+        for method in methods:
+            if method not in allmethods:
+                msg = 'WARNING: method "{}" not recognized,'.format(method)
+                msg += ' skipping it.'
+                print(msg)
+        n = self.size
+        topology = self.topology
+        stamp = self.stamp
+        (blockboards, lineboards) = self.getintersectionmasks()
+        # units of the lines crossing each block and of the blocks crossing each line;
+        # when solving, a block or line is only examined if it or one of these was modified
+        # since the last examination (see isdirty)
+        unitoffsets = {'row': 0, 'column': n, 'block': 2*n}
+        blocklineunits = [[unitoffsets[linelabel]+line for linelabel in ['row','column']
+                           for line in topology.blocklines[linelabel][block]]
+                          for block in range(n)]
+        lineblockunits = {linelabel: [[2*n+block for block in topology.lineblocks[linelabel][line]]
+                                      for line in range(n)]
+                          for linelabel in ['row','column']}
         res = []
-        # loop over all elements to be filled
-        for el in range(1,self.size+1):
-            if el in block: continue
-            # find all rows and columns where this element is a candidate
-            # (within this block)
-            rows = []
-            columns = []
-            for i in range(self.size):
-                if el not in blockcands[i]: continue
-                row, column = self.getcell('block', blockindex, i)
-                rows.append(row)
-                columns.append(column)
-            # find unique rows and columns
-            unique_rows = list(set(rows))
-            unique_columns = list(set(columns))
-            # case where all candidates are in one row
-            if len(unique_rows)==1:
-                useful = False
-                row = unique_rows[0]
-                for column in range(self.size):
-                    if column in unique_columns: continue
-                    if el in self.candidates[row][column]: useful = True
-                    if solve: self.removecandidate(row, column, el)
-                if useful:
-                    cells = []
-                    for s in unique_columns: cells.append((row, s))
-                    res.append({'method':'blocklineinteraction',
-                                'infokeys':['blockindex','linelabel','lineindex','value','cells'],
-                                'blockindex':blockindex, 'linelabel':'row', 'lineindex':row,
-                                'value':el, 'cells':cells})
-                    if verbose: self.writemessage('Found block-row interaction')
-            # case where all candidates are in one column
-            if len(unique_columns)==1:
-                useful = False
-                column = unique_columns[0]
-                for row in range(self.size):
-                    if row in unique_rows: continue
-                    if el in self.candidates[row][column]: useful = True
-                    if solve: self.removecandidate(row, column, el)
-                if useful: 
-                    cells = []
-                    for s in unique_rows: cells.append((s, column))
-                    res.append({'method': 'blocklineinteraction',
-                                'infokeys': ['blockindex','linelabel','lineindex','value','cells'],
-                                'blockindex': blockindex, 'linelabel': 'column',
-                                'lineindex': column, 'value': el, 'cells': cells})
-                    if verbose: self.writemessage('Found block-column interaction')
-        #if verbose and len(res)==0: self.writemessage('(no block-line interactions found.)')
-        return res 
-                                
-    def lineblockinteraction(self, line, lineindex, linelabel, linecands,
-            solve=True, verbose=False):
-        # ADVANCED solving method (row/column-based)
-        # if a candidate occurs in only one block within a row/column, 
-        # remove it from the rest of the block
+        if 'blocklineinteraction' in methods:
+            for block in range(n):
+                unit = 2*n+block
+                if solve and not self.isdirty(('blocklineinteraction', unit),
+                                              [unit]+blocklineunits[block], stamp): continue
+                for el in range(1, n+1):
+                    for linelabel in ['row','column']:
+                        board = blockboards[linelabel][el][block]
+                        # case where all candidates are in one line
+                        if popcount(board)!=1: continue
+                        line = topology.blocklines[linelabel][block][board.bit_length()-1]
+                        key = (block, linelabel, line)
+                        useful = False
+                        for index in topology.lineremainders[key]:
+                            if not (self.masks[index] >> el) & 1: continue
+                            useful = True
+                            if solve: self.removecandidate(*topology.coords[index], el)
+                        if useful:
+                            cells = [topology.coords[index] for index in topology.intersections[key]
+                                     if (self.masks[index] >> el) & 1]
+                            res.append({'method': 'blocklineinteraction',
+                                        'infokeys': ['blockindex','linelabel','lineindex',
+                                                     'value','cells'],
+                                        'blockindex': block, 'linelabel': linelabel,
+                                        'lineindex': line, 'value': el, 'cells': cells})
+                            if verbose: self.logger.debug('Found block-{} interaction', linelabel)
+        if 'lineblockinteraction' in methods:
+            for line in range(n):
+                for linelabel in ['row','column']:
+                    unit = unitoffsets[linelabel]+line
+                    if solve and not self.isdirty(('lineblockinteraction', unit),
+                                                  [unit]+lineblockunits[linelabel][line], stamp):
+                        continue
+                    for el in range(1, n+1):
+                        board = lineboards[linelabel][el][line]
+                        # case where all candidates occur within a single block
+                        if popcount(board)!=1: continue
+                        block = topology.lineblocks[linelabel][line][board.bit_length()-1]
+                        key = (block, linelabel, line)
+                        useful = False
+                        for index in topology.blockremainders[key]:
+                            if not (self.masks[index] >> el) & 1: continue
+                            useful = True
+                            if solve: self.removecandidate(*topology.coords[index], el)
+                        if useful:
+                            cells = [topology.coords[index] for index in topology.intersections[key]
+                                     if (self.masks[index] >> el) & 1]
+                            res.append({'method': 'lineblockinteraction',
+                                        'infokeys': ['lineindex','linelabel','blockindex',
+                                                     'value','cells'],
+                                        'lineindex': line, 'linelabel': linelabel,
+                                        'blockindex': block, 'value': el, 'cells': cells})
+                            if verbose: self.logger.debug('Found line-block interaction')
+        if 'blockblockinteraction' in methods:
+            dirty = [True]*n
+            if solve:
+                dirty = [self.isdirty(('blockblockinteraction', 2*n+block),
+                                      [2*n+block]+blocklineunits[block], stamp)
+                         for block in range(n)]
+            for block in range(n):
+                for linelabel in ['row','column']:
+                    method = {'row': 'blockblockhorizontalinteraction',
+                              'column': 'blockblockverticalinteraction'}[linelabel]
+                    lines = topology.blocklines[linelabel][block]
+                    # loop over the aligned blocks further on in the grid
+                    for other in range(block+1, n):
+                        if topology.blocklines[linelabel][other]!=lines: continue
+                        if not (dirty[block] or dirty[other]): continue
+                        for el in range(1, n+1):
+                            board1 = blockboards[linelabel][el][block]
+                            board2 = blockboards[linelabel][el][other]
+                            # skip values that are already filled in either block
+                            if board1==0 or board2==0: continue
+                            # case where candidates are grouped in only two lines
+                            if popcount(board1 | board2)!=2: continue
+                            found = [lines[k] for k in masktolist(board1 | board2)]
+                            useful = False
+                            for line in found:
+                                # remaining positions: outside of both blocks
+                                for index in topology.lineremainders[(block, linelabel, line)]:
+                                    if topology.cellblock[index]==other: continue
+                                    if not (self.masks[index] >> el) & 1: continue
+                                    useful = True
+                                    if solve: self.removecandidate(*topology.coords[index], el)
+                            if useful:
+                                cells = []
+                                for line in found:
+                                    for index in topology.groups[linelabel][line]:
+                                        cells.append(topology.coords[index])
+                                res.append({'method': method,
+                                            'infokeys': ['block1index','block2index','value','cells'],
+                                            'block1index': block, 'block2index': other,
+                                            'value': el, 'cells': cells})
+                                if verbose:
+                                    self.logger.debug('Found {} block-block interaction',
+                                        'horizontal' if linelabel=='row' else 'vertical')
+        #if verbose and len(res)==0: self.logger.debug('(no locked candidates found.)')
+        return res
+    
+    def getbitboards(self):
+        # help function for fish
+        # returns:
+        #   two lists of lists (rowboards, columnboards) of bitmasks, where
+        #   rowboards[value][row] has bit number j set if value is a candidate in (row,j)
+        #   and columnboards[value][column] has bit number i set if value is a candidate
+        #   in (i,column), only considering unfilled cells;
+        #   lines in which the value is already filled get bitmask 0
+        n = self.size
+        rowboards = [[0]*n for value in range(n+1)]
+        columnboards = [[0]*n for value in range(n+1)]
+        filled = []
+        for index in range(self.topology.ncells):
+            (row, column) = self.topology.coords[index]
+            if self.grid[row,column]!=0:
+                filled.append((row, column, int(self.grid[row,column])))
+                continue
+            for value in masktolist(self.masks[index]):
+                rowboards[value][row] |= 1 << column
+                columnboards[value][column] |= 1 << row
+        for (row, column, value) in filled:
+            rowboards[value][row] = 0
+            columnboards[value][column] = 0
+        return (rowboards, columnboards)
+
+    def fish(self, baselabel, solve=True, verbose=False, maxsize=None):
+        # HYPERADVANCED solving method (grid-based)
+        # find basic fish patterns (X-wing, swordfish, jellyfish, ...) for each value:
+        # if in n base lines (columns or rows) all positions for a value
+        # lie in the same n cover lines (rows or columns respectively),
+        # the value can be removed from all other positions in the cover lines
         # input arguments:
+        # - baselabel: type of the base lines, 'column' or 'row'
         # - solve: boolean whether to modify the grid or only return hint
-        
-        #if verbose: self.writemessage('Searching for line-block interactions...')
+        # - maxsize: maximum number of base lines in a pattern (default: size/2;
+        #   a larger pattern corresponds to a smaller one with base and cover lines swapped)
+        # note: when solving, a value is skipped if its positions did not change
+        #       since the last examination (see isdirty)
+        if maxsize is None: maxsize = self.size//2
+        stamp = self.stamp
+        (rowboards, columnboards) = self.getbitboards()
+        boards = columnboards if baselabel=='column' else rowboards
+        method = 'swordfishcolumns' if baselabel=='column' else 'swordfishrows'
         res = []
-        # loop over all elements to be filled
         for el in range(1,self.size+1):
-            if el in line: continue
-            # find all blocks where this element is a candidate
-            # (within this line)
-            cells = []
-            blocks = []
-            for i in range(self.size):
-                if el not in linecands[i]: continue
-                row, column = self.getcell(linelabel, lineindex, i)
-                cells.append((row, column))
-                blocks.append(self.getblockindex(row,column))
-            unique_blocks = list(set(blocks))
-            # case where all candidates occur within a single block
-            if len(unique_blocks)==1:
+            if solve and not self.isdirty((method, maxsize, el), [], stamp, values=[el]):
+                continue
+            # base lines with only one position are singles, not part of a fish
+            lines = [board if popcount(board)>=2 else 0 for board in boards[el]]
+            found = []
+            for (baselines, coverbits) in self.findsubsets(lines, maxsize):
+                found.append((baselines, masktolist(coverbits)))
+            for (baselines, coverlines) in sorted(found):
+                pattern = []
+                for base in baselines:
+                    for cover in masktolist(lines[base]):
+                        if baselabel=='column': pattern.append((cover,base))
+                        else: pattern.append((base,cover))
+                # remove from all positions in the cover lines except the pattern
                 useful = False
-                block = unique_blocks[0]
-                # loop over all other cells in the block
-                firstrow, firstcolumn = np.multiply(divmod(block, self.blocksize), self.blocksize)
-                for row in range(firstrow, firstrow+self.blocksize):
-                    for column in range(firstcolumn, firstcolumn+self.blocksize):
-                        if linelabel=='row' and row==lineindex: continue
-                        if linelabel=='column' and column==lineindex: continue
-                        if el in self.candidates[row][column]:
-                            useful = True
-                            if solve: self.removecandidate(row, column, el)
+                for cover in coverlines:
+                    if baselabel=='column': cells = self.topology.rows[cover]
+                    else: cells = self.topology.columns[cover]
+                    for index in cells:
+                        if not (self.masks[index] >> el) & 1: continue
+                        (i,j) = self.topology.coords[index]
+                        if self.grid[i,j]!=0 or (i,j) in pattern: continue
+                        useful = True
+                        if solve: self.removecandidate(i,j,el)
                 if useful:
-                    res.append({'method': 'lineblockinteraction',
-                                'infokeys': ['lineindex','linelabel','blockindex','value','cells'],
-                                'lineindex': lineindex, 'linelabel':linelabel,
-                                'blockindex': block, 'value': el, 'cells': cells})
-                    if verbose: self.writemessage('Found line-block interaction')
-        #if verbose and len(res)==0: self.writemessage('(no line-block interactions found.)')
+                    res.append({'method': method,
+                                'infokeys': ['value','pattern'],
+                                'value':el, 'pattern':pattern})
+                    if verbose: self.logger.debug('Found {}-wise fish pattern of size {}',
+                                                  baselabel, len(baselines))
         return res
-                                
-    def blockblockhorizontalinteraction(self, group, groupindex, label, candidates,
-            solve=True, verbose=False):
-        # ADVANCED solving method (block-based)
-        # if a candidate occurs in only two rows in two horizontally aligned blocks, 
-        # remove it from the remaining positions in those rows
+
+    def swordfishcolumns(self, solve=True, verbose=False):
+        # HYPERADVANCED solving method (grid-based)
+        # find a fish pattern with columns as base lines
+        # and eliminate suitable candidates from the rows (see fish)
+        return self.fish('column', solve=solve, verbose=verbose)
+
+    def swordfishrows(self, solve=True, verbose=False):
+        # HYPERADVANCED solving method (grid-based)
+        # mirror of swordfishcolumns
+        return self.fish('row', solve=solve, verbose=verbose)
+
+    def shareone(self, mask1, mask2):
+        # help function for XY wing
+        # note: mask1 and mask2 are expected to be candidate bitmasks with two candidates
+        # returns: the unique element shared between mask1 and mask2, or -1 otherwise
+        shared = mask1 & mask2
+        if shared and not (shared & (shared-1)): return shared.bit_length()-1
+        return -1
+
+    def xywing(self, solve=True, verbose=False):
+        # HYPERADVANCED solving method (grid-based)
+        # find XY pattern and remove candidate from cells that intersect with both wings
+        # (the base and wings are taken from the set of cells with two candidates,
+        #  and only the common peers of both wings are checked for removal)
         # input arguments:
         # - solve: boolean whether to modify the grid or only return hint
-        
-        #if verbose: self.writemessage('Searching for horizontal block-block interactions.')
         res = []
-        # loop over all other blocks than the one provided as argument
-        for i in range(self.size):
-            if i<=groupindex: continue
-            # (note: the above should be != instead of <= to be fully general,
-            #  but in practice this is always run in a loop, so it is ok)
-            # ignore blocks that are not horizontally aligned
-            firstrow = self.getcell(label, groupindex, 0)[0]
-            testrow = self.getcell(label, i, 0)[0]
-            if testrow!=firstrow: continue
-            groupi, candidatesi = self.getblock(i)
-            # loop over all elements to be filled
-            for el in range(1, self.size+1):
-                if(el in group or el in groupi): continue
-                # find unique rows and columns where this element is a candidate
-                # (within these two blocks)
-                rows = []
-                columns = []
-                for j in range(self.size):
-                    if el in candidates[j]:
-                        row,column = self.getcell(label, groupindex, j)
-                        if row not in rows: rows.append(row)
-                        if column not in columns: columns.append(column)
-                    if el in candidatesi[j]:
-                        row,column = self.getcell(label, i, j)
-                        if row not in rows: rows.append(row)
-                        if column not in columns: columns.append(column)
-                # case where candidates are grouped in only two rows
-                if len(rows)==2:
+        topology = self.topology
+        # loop over all cells with exactly two candidates
+        for index1 in sorted(self.bivalues):
+            cands1 = self.masks[index1]
+            if not popcount(cands1)==2: continue
+            # find the other cells with exactly two candidates that intersect with the first one
+            # and share a unique element with it
+            shareone = [index for index in topology.peers[index1]
+                        if index in self.bivalues and self.shareone(cands1, self.masks[index])>0]
+            # loop over pairs of cells that share a unique element
+            # with the given cell
+            for c1 in range(len(shareone)-1):
+                for c2 in range(c1+1, len(shareone)):
+                    index2 = shareone[c1]
+                    index3 = shareone[c2]
+                    # they must not intersect
+                    peers3 = topology.peersets[index3]
+                    if index2 in peers3: continue
+                    # they must share a unique element
+                    # that is not in the candidates of the given cell
+                    share = self.shareone(self.masks[index2], self.masks[index3])
+                    if(share<0 or (cands1 >> share) & 1): continue
+                    # found an xy-wing, now check if it is useful
+                    # for removing other candidates
                     useful = False
-                    for j in range(self.size):
-                        if j in columns: continue
-                        if el in self.candidates[rows[0]][j]:
-                            useful = True
-                            if solve: self.removecandidate(rows[0], j, el)
-                        if el in self.candidates[rows[1]][j]:
-                            useful = True
-                            if solve: self.removecandidate(rows[1], j, el)
-                    if useful:
-                        cells = []
-                        for j in range(self.size):
-                            cells.append((rows[0],j))
-                            cells.append((rows[1],j))
-                        res.append({'method': 'blockblockhorizontalinteraction',
-                                    'infokeys': ['block1index','block2index','value','cells'],
-                                    'block1index': groupindex, 'block2index': i,
-                                    'value':el, 'cells':cells})
-                        if verbose: self.writemessage('Found horizontal block-block interaction')
-        #if verbose and len(res)==0:
-        #    self.writemessage('(no horizontal block-block interaction found.)')
+                    for index in topology.peers[index2]:
+                        if index not in peers3: continue
+                        if not (self.masks[index] >> share) & 1: continue
+                        useful = True
+                        (rwa, clmna) = topology.coords[index]
+                        if solve: self.removecandidate(rwa, clmna, share)
+                    if useful: 
+                        res.append({'method':'xywing','infokeys':['cells','value'],
+                                    'cells':[topology.coords[index1], topology.coords[index2],
+                                             topology.coords[index3]],
+                                    'value':share})
+                        if verbose: self.logger.debug('Found XY-wing')
         return res
-        
-    def blockblockverticalinteraction(self, group, groupindex, label, candidates,
-            solve=True, verbose=False):
-        # ADVANCED solving method (block-based)
-        # if a candidate occurs in only two columns in two vertically aligned blocks, 
-        # remove it from the remaining positions in those columns
+
+    def xyzwing(self, solve=True, verbose=False):
+        # HYPERADVANCED solving method (grid-based)
+        # if a cell with three candidates xyz (the base) intersects with two cells
+        # with candidates xz and yz (the wings), z can be removed from all cells
+        # that intersect with the base and both wings
         # input arguments:
         # - solve: boolean whether to modify the grid or only return hint
-        
-        #if verbose: self.writemessage('Searching for vertical block-block interactions...')
         res = []
-        # loop over al other blocks than the one provided as argument
-        for i in range(self.size):
-            if i<=groupindex: continue
-            # (note: the above should be != instead of <= to be fully general,
-            #  but in practice this is always run in a loop, so it is ok)
-            # ignore blocks that are not vertically aligned
-            firstcolumn = self.getcell(label, groupindex, 0)[1]
-            testcolumn = self.getcell(label, i, 0)[1]
-            if testcolumn!=firstcolumn: continue
-            groupi,candidatesi = self.getblock(i)
-            # loop over all elements to be filled
-            for el in range(1,self.size+1):
-                if(el in group or el in groupi): continue
-                # find unique rows and columns where this element is a candidate
-                # (within these two blocks)
-                rows = []
-                columns = []
-                for j in range(self.size):
-                    if el in candidates[j]:
-                        row,column = self.getcell(label, groupindex, j)
-                        if row not in rows: rows.append(row)
-                        if column not in columns: columns.append(column)
-                    if el in candidatesi[j]:
-                        row,column = self.getcell(label, i, j)
-                        if row not in rows: rows.append(row)
-                        if column not in columns: columns.append(column)
-                # case where candidates are grouped in only two columns
-                if len(columns)==2:
+        topology = self.topology
+        for index1 in range(topology.ncells):
+            cands1 = self.masks[index1]
+            if not popcount(cands1)==3: continue
+            # find the cells with two candidates, both in the base, that intersect with the base
+            wings = [index for index in topology.peers[index1]
+                     if index in self.bivalues and not self.masks[index] & ~cands1]
+            for c1 in range(len(wings)-1):
+                for c2 in range(c1+1, len(wings)):
+                    index2 = wings[c1]
+                    index3 = wings[c2]
+                    # (the candidates are read again, as removals for an earlier pair
+                    #  may have filled the base or the wings in the meantime)
+                    cands1 = self.masks[index1]
+                    cands2 = self.masks[index2]
+                    cands3 = self.masks[index3]
+                    if popcount(cands1)!=3 or popcount(cands2)!=2 or popcount(cands3)!=2: continue
+                    if cands2 & ~cands1 or cands3 & ~cands1: continue
+                    if popcount(cands2 & cands3)!=1: continue
+                    # the wings share exactly one candidate (z), as both are subsets of the base
+                    share = (cands2 & cands3).bit_length()-1
+                    peers2 = topology.peersets[index2]
+                    peers3 = topology.peersets[index3]
                     useful = False
-                    for j in range(self.size):
-                        if j in rows: continue
-                        if el in self.candidates[j][columns[0]]:
-                            useful = True
-                            if solve: self.removecandidate(j, columns[0], el)
-                        if el in self.candidates[j][columns[1]]:
-                            useful = True
-                            if solve: self.removecandidate(j, columns[1], el)
+                    for index in topology.peers[index1]:
+                        if index not in peers2 or index not in peers3: continue
+                        if not (self.masks[index] >> share) & 1: continue
+                        useful = True
+                        (rwa, clmna) = topology.coords[index]
+                        if solve: self.removecandidate(rwa, clmna, share)
                     if useful:
-                        cells = []
-                        for j in range(self.size): 
-                            cells.append((j,columns[0]))
-                            cells.append((j,columns[1]))
-                        res.append({'method': 'blockblockverticalinteraction',
-                                    'infokeys': ['block1index','block2index','value','cells'],
-                                    'block1index': groupindex, 'block2index': i,
-                                    'value': el,'cells': cells})
-                        if verbose: self.writemessage('Found vertical block-block interaction')
-        #if verbose and len(res)==0:
-        #    self.writemessage('(no vertical block-block interaction found.)')
+                        res.append({'method':'xyzwing','infokeys':['cells','value'],
+                                    'cells':[topology.coords[index1], topology.coords[index2],
+                                             topology.coords[index3]],
+                                    'value':share})
+                        if verbose: self.logger.debug('Found XYZ-wing')
         return res
-    
-    def swordfishcolumns(self, solve=True, verbose=False):
+
+    def uniquerectangle(self, solve=True, verbose=False):
         # HYPERADVANCED solving method (grid-based)
-        # find a swordfish pattern in the columns of the grid 
-        # and eliminate suitable candidates from the rows
+        # if the sudoku is assumed to have a unique solution,
+        # there cannot be a rectangle (2 rows, 2 columns, 2 blocks) of unfilled cells
+        # that can only hold the same two values a and b, since these could be swapped.
+        # starting from two cells (the 'floor') with candidates ab in the same row or column,
+        # the other two corners (the 'roof') must contain a and b and other candidates:
+        # - type 1: one roof cell has only ab: remove a and b from the other roof cell
+        # - type 2: both roof cells have the same single extra candidate c:
+        #   remove c from all cells that intersect with both roof cells
+        # - type 3: the roof cells have two extra candidates cd in total, and another cell
+        #   in a group shared by the roof cells has candidates cd: this is a naked pair,
+        #   so remove c and d from all other cells in that group
+        # - type 4: within a group shared by the roof cells, a can only be in the roof cells:
+        #   remove b from both roof cells
+        # (the floor cells are taken from the cells with two candidates, grouped by candidates)
         # input arguments:
         # - solve: boolean whether to modify the grid or only return hint
-        # todo: maybe rewrite in this style: https://www.learn-sudoku.com/swordfish.html
-        # todo: it seems unnecessary to split into rows and column separately
-        # (however, currently works correctly)
-        # STEP 1: find all columns that have exactly two spots for a given candidate
         res = []
-        for el in range(1,self.size+1):
-            cols = []
-            rows = []
-            for i in range(self.size):
-                rowsi = []
-                for j in range(self.size):
-                    if el in self.candidates[j][i]: rowsi.append(j)
-                rows.append(rowsi)
-                if len(rowsi)==2:
-                    cols.append(i)
-            if len(cols)<2: continue
-            # STEP 2: find a subset of properly aligning columns
-            # STEP 2a: find all subsets of suitable columns
-            colssubsets = list(itertools.combinations(cols,2))
-            for i in range(3,len(cols)+1):
-                toappend = list(itertools.combinations(cols,i))
-                for subset in toappend: colssubsets.append(subset)
-            for colssubset in colssubsets:
-                # STEP 2b: for each subset, find unique rows
-                uniquerows = []
-                for j in colssubset:
-                    if rows[j][0] not in uniquerows: uniquerows.append(rows[j][0])
-                    if rows[j][1] not in uniquerows: uniquerows.append(rows[j][1])
-                if len(uniquerows)!=len(colssubset): continue
-                # STEP 3: remove candidates from these rows
-                # that do not belong to the swordfish pattern
-                # STEP 3a: define pattern in suitable format
-                pattern = []
-                for j in colssubset:
-                    for i in rows[j]:
-                        pattern.append((i,j))
-                # STEP 3b: remove from all positions in unique rows except swordfish
-                useful = False
-                for i in uniquerows:
-                    for j in range(self.size):
-                        if((i,j) not in pattern): 
-                            if el in self.candidates[i][j]: 
-                                useful = True
-                            if solve: self.removecandidate(i,j,el)
-                if useful: 
-                    res.append({'method': 'swordfishcolumns',
-                                'infokeys': ['value','pattern'],
-                                'value':el, 'pattern':pattern})
-                    if verbose: self.writemessage('Found column-wise swordfish pattern')
+        topology = self.topology
+        n = self.size
+        b = self.blocksize
+        pairs = {}
+        for index in self.bivalues: pairs.setdefault(self.masks[index], []).append(index)
+        done = set()
+        for pair in sorted(pairs):
+            cells = sorted(pairs[pair])
+            for k1 in range(len(cells)-1):
+                for k2 in range(k1+1, len(cells)):
+                    floor = (cells[k1], cells[k2])
+                    if self.masks[floor[0]]!=pair or self.masks[floor[1]]!=pair: continue
+                    (row1, column1) = topology.coords[floor[0]]
+                    (row2, column2) = topology.coords[floor[1]]
+                    # the rectangle must span exactly two blocks
+                    sameblock = (topology.cellblock[floor[0]]==topology.cellblock[floor[1]])
+                    if row1==row2:
+                        roofs = [(row*n+column1, row*n+column2) for row in range(n)
+                                 if row!=row1 and (row//b==row1//b)!=sameblock]
+                    elif column1==column2:
+                        roofs = [(row1*n+column, row2*n+column) for column in range(n)
+                                 if column!=column1 and (column//b==column1//b)!=sameblock]
+                    else: continue
+                    for roof in roofs:
+                        # (a rectangle with three bivalue corners is found from two floors)
+                        key = frozenset(floor+roof)
+                        if key in done: continue
+                        done.add(key)
+                        res += self.uniquerectangletypes(pair, floor, roof,
+                                                         solve=solve, verbose=verbose)
         return res
-                        
-    def swordfishrows(self, solve=True, verbose=False):
-        # HYPERADVANCED solving method (grid-based)
-        # mirror of swordfishcolumns
+
+    def uniquerectangletypes(self, pair, floor, roof, solve=True, verbose=False):
+        # help function for uniquerectangle
+        # check the types of unique rectangle for given candidates and floor and roof cells
+        topology = self.topology
+        masks = self.masks
+        for index in roof:
+            row, column = topology.coords[index]
+            if self.grid[row,column]!=0 or (masks[index] & pair)!=pair: return []
+        extra1 = masks[roof[0]] & ~pair
+        extra2 = masks[roof[1]] & ~pair
+        if not extra1 and not extra2: return []
+        # find the possible removals for each type as (type, target cells, values)
+        removals = []
+        if not extra1: removals.append((1, [roof[1]], pair))
+        elif not extra2: removals.append((1, [roof[0]], pair))
+        else:
+            units = [topology.units[unit] for unit in topology.cellunits[roof[0]]
+                     if unit in topology.cellunits[roof[1]]]
+            if extra1==extra2 and popcount(extra1)==1:
+                targets = [index for index in topology.peers[roof[0]]
+                           if index in topology.peersets[roof[1]]]
+                removals.append((2, targets, extra1))
+            extra = extra1 | extra2
+            if popcount(extra)==2:
+                for unit in units:
+                    for other in unit:
+                        if other in roof or masks[other]!=extra: continue
+                        targets = [index for index in unit if index not in roof and index!=other]
+                        removals.append((3, targets, extra))
+            for unit in units:
+                for value in masktolist(pair):
+                    positions = [index for index in unit if (masks[index] >> value) & 1]
+                    if sorted(positions)!=sorted(roof): continue
+                    removals.append((4, list(roof), pair & ~(1 << value)))
         res = []
-        for el in range(1,self.size+1):
-            cols = []
-            rows = []
-            for i in range(self.size):
-                colsi = []
-                for j in range(self.size):
-                    if el in self.candidates[i][j]: colsi.append(j)
-                cols.append(colsi)
-                if len(colsi)==2:
-                    rows.append(i)
-            if len(rows)<2: continue
-            rowssubsets = list(itertools.combinations(rows,2))
-            for i in range(3,len(rows)+1):
-                toappend = list(itertools.combinations(rows,i))
-                for subset in toappend: rowssubsets.append(subset)
-            for rowssubset in rowssubsets:
-                uniquecols = []
-                for j in rowssubset:
-                    if cols[j][0] not in uniquecols: uniquecols.append(cols[j][0])
-                    if cols[j][1] not in uniquecols: uniquecols.append(cols[j][1])
-                if len(uniquecols)!=len(rowssubset): continue
-                pattern = []
-                for i in rowssubset:
-                    for j in cols[i]:
-                            pattern.append((i,j))
-                useful = False
-                for j in uniquecols:
-                    for i in range(self.size):
-                        if((i,j) not in pattern): 
-                            if el in self.candidates[i][j]: useful = True
-                            if solve: self.removecandidate(i,j,el)
-                if useful: 
-                    res.append({'method':'swordfishrows','infokeys':['value','pattern'],
-                                'value':el,'pattern':pattern})
-                    if verbose: self.writemessage('Found row-wise swordfish pattern')
+        for (urtype, targets, valuemask) in removals:
+            cells = []
+            for index in targets:
+                (row, column) = topology.coords[index]
+                if self.grid[row,column]!=0 or not masks[index] & valuemask: continue
+                cells.append((row, column))
+                if solve:
+                    for value in masktolist(masks[index] & valuemask):
+                        self.removecandidate(row, column, value)
+            if len(cells)==0: continue
+            res.append({'method':'uniquerectangle',
+                        'infokeys':['cells', 'type', 'pair', 'targets', 'values'],
+                        'cells':[topology.coords[index] for index in floor+roof],
+                        'type': urtype,
+                        'pair': masktolist(pair),
+                        'targets': cells,
+                        'values': masktolist(valuemask)})
+            if verbose: self.logger.debug('Found unique rectangle of type {}', urtype)
         return res
 
-    def intersect(self, coords1, coords2):
-        # help function for XY wing
-        # returns True if coord1 and coords2 intersect,
-        # i.e. if they are in the same row, column or block
-        (rw1,clmn1) = coords1
-        (rw2,clmn2) = coords2
-        if rw1==rw2: return True
-        if clmn1==clmn2: return True
-        if self.getblockindex(rw1,clmn1)==self.getblockindex(rw2,clmn2): return True
-        return False
 
-    def shareone(self, cands1, cands2):
-        # help function for XY wing
-        # note: cands1 and cands2 are expected to be lists/arrays of length 2
-        # returns: the unique element shared between cands1 and cands2, or -1 otherwise
-        if(cands2[0] in cands1 and not cands2[1] in cands1): return cands2[0]
-        if(cands2[0] not in cands1 and cands2[1] in cands1): return cands2[1]
-        return -1
+    def getstronglinks(self):
+        # help function for the single-digit chain methods (see below)
+        # returns:
+        #   a list with for each value a list of (cell index, cell index, unit) tuples,
+        #   one for each strong link of the value, i.e. a unit (see topology.units)
+        #   in which only two unfilled cells have the value as candidate
+        #   (taken from self.stronglinks, kept up to date by updatecounts)
+        n = self.size
+        links = [[] for value in range(n+1)]
+        for key in sorted(self.stronglinks):
+            (unit, value) = divmod(key, n+1)
+            if self.placedcounts[key]>0: continue
+            cells = [index for index in self.topology.units[unit]
+                     if (self.masks[index] >> value) & 1
+                     and self.grid[self.topology.coords[index]]==0]
+            if len(cells)==2: links[value].append((cells[0], cells[1], unit))
+        return links
 
-    def xywing(self, solve=True, verbose=False):
+    def commonpeers(self, value, indices):
+        # help function for the single-digit chain methods (see below)
+        # returns the indices of the unfilled cells with a value as candidate
+        # that see all given cells (not including the given cells themselves)
+        topology = self.topology
+        res = []
+        for index in topology.peers[indices[0]]:
+            if index in indices or not (self.masks[index] >> value) & 1: continue
+            if self.grid[topology.coords[index]]!=0: continue
+            if all(index in topology.peersets[other] for other in indices[1:]): res.append(index)
+        return res
+
+    def skyscraper(self, solve=True, verbose=False):
         # HYPERADVANCED solving method (grid-based)
-        # find XY pattern and remove candidate from cells that intersect with both wings
+        # if a value has strong links (see getstronglinks) in two rows,
+        # and one end of both links (the base) is in the same column,
+        # the value must be in one of the other ends (the roof),
+        # so it can be removed from all cells that see both ends of the roof
+        # (and vice versa with rows and columns swapped)
         # input arguments:
         # - solve: boolean whether to modify the grid or only return hint
+        # note: when solving, a value is skipped if its positions did not change
+        #       since the last examination (see isdirty)
         res = []
-        # loop over all cells in the grid
-        for row1 in range(self.size):
-            for column1 in range(self.size):
-                # skip cells that do not have exactly 2 candidates
-                if not len(self.candidates[row1][column1])==2: continue
-                cands1 = self.candidates[row1][column1]
-                shareone = []
-                # loop over all other cells in the grid
-                # that have exactly two candidates and interset with the first one
-                for row2 in range(self.size):
-                    for column2 in range(self.size):
-                        if not len(self.candidates[row2][column2])==2: continue
-                        if not self.intersect((row1,column1), (row2,column2)): continue
-                        cands2 = self.candidates[row2][column2]
-                        # find the unique element shared between the candidates
-                        # of both cells
-                        share = self.shareone(cands1,cands2)
-                        if share>0: shareone.append((row2, column2))
-                # if less than two cells that share a unique element
-                # with the given cell are found, skip.
-                if len(shareone)<2: continue
-                # loop over pairs of cells that share a unique element
-                # with the given cell
-                for c1 in range(len(shareone)-1):
-                    for c2 in range(c1+1, len(shareone)):
-                        (rw2,clmn2) = shareone[c1]
-                        (rw3,clmn3) = shareone[c2]
-                        # they must not intersect
-                        if self.intersect((rw3,clmn3), (rw2,clmn2)): continue
-                        # they must share a unique element
-                        # that is not in the candidates of the given cell
-                        cands2 = self.candidates[rw2][clmn2]
-                        cands3 = self.candidates[rw3][clmn3]
-                        share = self.shareone(cands2, cands3)
-                        if(share<0 or share in cands1): continue
-                        # found an xy-wing, now check if it is useful
-                        # for removing other candidates
-                        useful = False
-                        for rwa in range(self.size):
-                            for clmna in range(self.size):
-                                intersect = ( 
-                                    self.intersect((rwa,clmna),(rw2,clmn2))
-                                    and self.intersect((rwa,clmna),(rw3,clmn3))
-                                )
-                                if not intersect: continue
-                                if(share in self.candidates[rwa][clmna]): useful = True
-                                if solve: self.removecandidate(rwa, clmna, share)
-                        if useful: 
-                            res.append({'method':'xywing','infokeys':['cells','value'],
-                                        'cells':[(row1,column1),(rw2,clmn2),(rw3,clmn3)],
-                                        'value':share})
-                            if verbose: self.writemessage('Found XY-wing')
+        stamp = self.stamp
+        n = self.size
+        topology = self.topology
+        links = self.getstronglinks()
+        for value in range(1, n+1):
+            if solve and not self.isdirty(('skyscraper', value), [], stamp, values=[value]):
+                continue
+            for (linelabel, offset) in [('row', 0), ('column', n)]:
+                lines = [(index1, index2) for (index1, index2, unit) in links[value]
+                         if offset<=unit<offset+n]
+                # the other type of line, in which the base must be
+                base = topology.cellcolumn if linelabel=='row' else topology.cellrow
+                for k1 in range(len(lines)-1):
+                    for k2 in range(k1+1, len(lines)):
+                        for (base1, roof1) in [lines[k1], lines[k1][::-1]]:
+                            for (base2, roof2) in [lines[k2], lines[k2][::-1]]:
+                                if base[base1]!=base[base2]: continue
+                                # (if the roof is aligned as well, this is an X-wing)
+                                if base[roof1]==base[roof2]: continue
+                                targets = self.commonpeers(value, [roof1, roof2])
+                                if len(targets)==0: continue
+                                if solve:
+                                    for index in targets:
+                                        self.removecandidate(*topology.coords[index], value)
+                                res.append({'method': 'skyscraper',
+                                            'infokeys': ['value','linelabel','cells','targets'],
+                                            'value': value, 'linelabel': linelabel,
+                                            'cells': [topology.coords[index] for index
+                                                      in [base1, roof1, base2, roof2]],
+                                            'targets': [topology.coords[index]
+                                                        for index in targets]})
+                                if verbose: self.logger.debug('Found skyscraper')
         return res
 
-    def uniquerectangle(self, solve=True, verbose=False):
+    def twostringkite(self, solve=True, verbose=False):
         # HYPERADVANCED solving method (grid-based)
-        # if the sudoku is assumed to have a unique solution,
-        # there cannot be a rectangle (2 rows, 2 columns, 2 blocks)
-        # with the same two candidates at each of the corner points
+        # if a value has a strong link (see getstronglinks) in a row and one in a column,
+        # and one end of both links is in the same block (but not in the same cell),
+        # the value must be in one of the other ends,
+        # so it can be removed from all cells that see both of them
+        # input arguments:
+        # - solve: boolean whether to modify the grid or only return hint
+        # note: when solving, a value is skipped if its positions did not change
+        #       since the last examination (see isdirty)
         res = []
-        # loop over all cells in the grid
-        for row1 in range(self.size):
-            for column1 in range(self.size):
-                # skip cells that do not have exactly 2 candidates
-                if not len(self.candidates[row1][column1])==2: continue
-                cands1 = self.candidates[row1][column1]
-                # find cells in the same row that have exactly the same two candidates
-                same_row_cols = []
-                rowcands = self.getrow(row1)[1]
-                for j in range(self.size):
-                    if j==column1: continue
-                    if set(rowcands[j])==set(cands1): same_row_cols.append(j)
-                if len(same_row_cols)==0: continue
-                # find the cells in the same column that have exactly the same two candidates
-                same_col_rows = []
-                colcands = self.getcolumn(column1)[1]
-                for j in range(self.size):
-                    if j==row1: continue
-                    if set(colcands[j])==set(cands1): same_col_rows.append(j)
-                if len(same_col_rows)==0: continue
-                # loop over all combinations of second and third cells
-                b1 = self.getblockindex(row1, column1)
-                for same_row_col in same_row_cols:
-                    b2 = self.getblockindex(row1, same_row_col)
-                    for same_col_row in same_col_rows:
-                        b3 = self.getblockindex(same_col_row, column1)
-                        # the three cells must be in two blocks
-                        # (i.e. not in three different blocks)
-                        if len(set([b1, b2, b3]))>2: continue
-                        # the fourth cell must not be filled
-                        # and must contain at least one of the two candidates
-                        cands4 = self.candidates[same_col_row][same_row_col]
-                        if len(cands4)==1: continue
-                        cands_to_remove = []
-                        if cands1[0] in cands4: cands_to_remove.append(cands1[0])
-                        if cands1[1] in cands4: cands_to_remove.append(cands1[1])
-                        if len(cands_to_remove)>0:
-                            res.append({'method':'uniquerectangle',
-                                        'infokeys':['cells', 'target', 'values'],
-                                        'cells':[
-                                            (row1, column1),
-                                            (row1, same_row_col),
-                                            (same_col_row, column1),
-                                            (same_col_row, same_row_col)],
-                                        'target': (same_col_row, same_row_col),
-                                        'values': cands_to_remove})
+        stamp = self.stamp
+        n = self.size
+        topology = self.topology
+        links = self.getstronglinks()
+        for value in range(1, n+1):
+            if solve and not self.isdirty(('twostringkite', value), [], stamp, values=[value]):
+                continue
+            rowlinks = [(index1, index2) for (index1, index2, unit) in links[value] if unit<n]
+            columnlinks = [(index1, index2) for (index1, index2, unit) in links[value]
+                           if n<=unit<2*n]
+            for rowlink in rowlinks:
+                for columnlink in columnlinks:
+                    for (rowbase, rowend) in [rowlink, rowlink[::-1]]:
+                        for (columnbase, columnend) in [columnlink, columnlink[::-1]]:
+                            if len(set([rowbase, rowend, columnbase, columnend]))<4: continue
+                            if topology.cellblock[rowbase]!=topology.cellblock[columnbase]:
+                                continue
+                            targets = self.commonpeers(value, [rowend, columnend])
+                            if len(targets)==0: continue
                             if solve:
-                                for cand in cands_to_remove:
-                                    self.removecandidate(same_col_row, same_row_col, cand)
-                            if verbose: self.writemessage('Found unique rectangle')
+                                for index in targets:
+                                    self.removecandidate(*topology.coords[index], value)
+                            res.append({'method': 'twostringkite',
+                                        'infokeys': ['value','cells','targets'],
+                                        'value': value,
+                                        'cells': [topology.coords[index] for index
+                                                  in [rowend, rowbase, columnbase, columnend]],
+                                        'targets': [topology.coords[index] for index in targets]})
+                            if verbose: self.logger.debug('Found 2-string kite')
+        return res
+
+    def simplecoloring(self, solve=True, verbose=False):
+        # HYPERADVANCED solving method (grid-based)
+        # for each value, the cells connected by strong links (see getstronglinks)
+        # are colored alternately with two colors, so that in each chain of linked cells,
+        # the value is either in all cells of the first color or in all cells of the second:
+        # - if two cells of the same color see each other, the value is not in that color,
+        #   so it can be removed from all cells of that color
+        # - else, the value can be removed from all other cells that see both colors
+        # input arguments:
+        # - solve: boolean whether to modify the grid or only return hint
+        # note: when solving, a value is skipped if its positions did not change
+        #       since the last examination (see isdirty)
+        res = []
+        stamp = self.stamp
+        topology = self.topology
+        links = self.getstronglinks()
+        for value in range(1, self.size+1):
+            if solve and not self.isdirty(('simplecoloring', value), [], stamp, values=[value]):
+                continue
+            graph = {}
+            for (index1, index2, unit) in links[value]:
+                graph.setdefault(index1, set()).add(index2)
+                graph.setdefault(index2, set()).add(index1)
+            colors = {}
+            for start in sorted(graph):
+                if start in colors: continue
+                # color the chain of linked cells containing the start cell
+                colors[start] = 0
+                chain = [[start], []]
+                queue = deque([start])
+                while len(queue)>0:
+                    index = queue.popleft()
+                    for other in sorted(graph[index]):
+                        if other in colors: continue
+                        colors[other] = 1-colors[index]
+                        chain[colors[other]].append(other)
+                        queue.append(other)
+                # case where two cells of the same color see each other
+                targets = []
+                for color in [0,1]:
+                    for index in chain[color]:
+                        if any(other in topology.peersets[index] for other in chain[color]):
+                            targets = [other for other in chain[color]
+                                       if (self.masks[other] >> value) & 1]
+                            break
+                    if len(targets)>0: break
+                # case where other cells see both colors
+                if len(targets)==0:
+                    for index in range(topology.ncells):
+                        if index in chain[0] or index in chain[1]: continue
+                        if not (self.masks[index] >> value) & 1: continue
+                        if self.grid[topology.coords[index]]!=0: continue
+                        peers = topology.peersets[index]
+                        if not (peers.isdisjoint(chain[0]) or peers.isdisjoint(chain[1])):
+                            targets.append(index)
+                if len(targets)==0: continue
+                if solve:
+                    for index in targets: self.removecandidate(*topology.coords[index], value)
+                res.append({'method': 'simplecoloring',
+                            'infokeys': ['value','color1','color2','targets'],
+                            'value': value,
+                            'color1': [topology.coords[index] for index in chain[0]],
+                            'color2': [topology.coords[index] for index in chain[1]],
+                            'targets': [topology.coords[index] for index in sorted(targets)]})
+                if verbose: self.logger.debug('Found simple coloring pattern')
+        return res
+
+    def xchain(self, solve=True, verbose=False):
+        # HYPERADVANCED solving method (grid-based)
+        # an X-chain is a chain of cells with a value as candidate, connected alternately
+        # by strong links (see getstronglinks) and weak links (cells that see each other),
+        # starting and ending with a strong link: if the value is not in the first cell,
+        # it must be in the second, so not in the third, so in the fourth, and so on,
+        # so it must be either in the first or in the last cell of the chain,
+        # and it can be removed from all other cells that see both
+        # (only chains with at least two strong links are considered,
+        #  as the others are covered by simpler methods)
+        # input arguments:
+        # - solve: boolean whether to modify the grid or only return hint
+        # note: when solving, a value is skipped if its positions did not change
+        #       since the last examination (see isdirty)
+        res = []
+        stamp = self.stamp
+        topology = self.topology
+        links = self.getstronglinks()
+        for value in range(1, self.size+1):
+            if solve and not self.isdirty(('xchain', value), [], stamp, values=[value]):
+                continue
+            strong = {}
+            for (index1, index2, unit) in links[value]:
+                strong.setdefault(index1, set()).add(index2)
+                strong.setdefault(index2, set()).add(index1)
+            weak = {}
+            for start in sorted(strong):
+                # breadth-first search over the cells where the value is not (False)
+                # or is (True) if it is not in the start cell, keeping track of the chain
+                parent = {(start, False): None}
+                queue = deque([(start, False)])
+                while len(queue)>0:
+                    (index, istrue) = queue.popleft()
+                    if istrue:
+                        if index not in weak: weak[index] = self.commonpeers(value, [index])
+                        following = [(other, False) for other in weak[index]]
+                    else: following = [(other, True) for other in sorted(strong.get(index, []))]
+                    for node in following:
+                        if node in parent: continue
+                        parent[node] = (index, istrue)
+                        queue.append(node)
+                for (end, istrue) in sorted(parent):
+                    if not istrue or end==start: continue
+                    chain = [end]
+                    node = parent[(end, istrue)]
+                    while node is not None:
+                        chain.insert(0, node[0])
+                        node = parent[node]
+                    if len(chain)<4: continue
+                    targets = self.commonpeers(value, [start, end])
+                    if len(targets)==0: continue
+                    if solve:
+                        for index in targets: self.removecandidate(*topology.coords[index], value)
+                    res.append({'method': 'xchain',
+                                'infokeys': ['value','chain','targets'],
+                                'value': value,
+                                'chain': [topology.coords[index] for index in chain],
+                                'targets': [topology.coords[index] for index in targets]})
+                    if verbose: self.logger.debug('Found X-chain of length {}', len(chain))
+        return res
+
+    def getbivaluegraph(self):
+        # help function for the bivalue chain methods (see below)
+        # returns:
+        #   a dict with for each cell with exactly two candidates (see self.bivalues)
+        #   the sorted list of the cells it is linked to, i.e. the other cells
+        #   with two candidates that it sees and shares at least one candidate with
+        #   (taken from self.bivaluelinks, kept up to date by updatecounts)
+        ncells = self.topology.ncells
+        graph = dict((index, []) for index in self.bivalues)
+        for key in sorted(self.bivaluelinks):
+            (index1, index2) = divmod(key, ncells)
+            graph[index1].append(index2)
+            graph[index2].append(index1)
+        for index in graph: graph[index].sort()
+        return graph
+
+    def xychainmemo(self):
+        # help function for xychain
+        # returns the dict with the chains found by previous calls
+        # (cleared if any cell with two candidates changed since the last call,
+        #  as the chains only depend on these cells and their candidates)
+        key = tuple((index, self.masks[index]) for index in sorted(self.bivalues))
+        if self.xymemo[0]!=key: self.xymemo = (key, {})
+        return self.xymemo[1]
+
+    def remotepair(self, solve=True, verbose=False):
+        # HYPERADVANCED solving method (grid-based)
+        # a remote pair is a chain of cells with the same two candidates a and b,
+        # in which each cell sees the next one (see getbivaluegraph),
+        # so that a and b alternate along the chain:
+        # the cells are colored alternately with two colors,
+        # and a and b can be removed from all other cells that see cells of both colors
+        # (only chains of at least four cells are considered,
+        #  as the shorter ones are covered by naked pairs)
+        # input arguments:
+        # - solve: boolean whether to modify the grid or only return hint
+        res = []
+        topology = self.topology
+        graph = self.getbivaluegraph()
+        colors = {}
+        for start in sorted(graph):
+            if start in colors: continue
+            pair = self.masks[start]
+            # color the chain of linked cells with the same candidates as the start cell
+            colors[start] = 0
+            chain = [[start], []]
+            queue = deque([start])
+            consistent = True
+            while len(queue)>0:
+                index = queue.popleft()
+                for other in graph[index]:
+                    if self.masks[other]!=pair: continue
+                    if other in colors:
+                        if colors[other]==colors[index]: consistent = False
+                        continue
+                    colors[other] = 1-colors[index]
+                    chain[colors[other]].append(other)
+                    queue.append(other)
+            # (if two linked cells have the same color, the grid has no solution)
+            if not consistent or len(chain[0])+len(chain[1])<4: continue
+            targets = []
+            for index in range(topology.ncells):
+                if not self.masks[index] & pair or index in chain[0] or index in chain[1]: continue
+                if self.grid[topology.coords[index]]!=0: continue
+                peers = topology.peersets[index]
+                if not (peers.isdisjoint(chain[0]) or peers.isdisjoint(chain[1])):
+                    targets.append(index)
+            if len(targets)==0: continue
+            if solve:
+                for index in targets:
+                    for value in masktolist(self.masks[index] & pair):
+                        self.removecandidate(*topology.coords[index], value)
+            res.append({'method': 'remotepair',
+                        'infokeys': ['pair','color1','color2','targets'],
+                        'pair': masktolist(pair),
+                        'color1': [topology.coords[index] for index in chain[0]],
+                        'color2': [topology.coords[index] for index in chain[1]],
+                        'targets': [topology.coords[index] for index in targets]})
+            if verbose: self.logger.debug('Found remote pair chain')
+        return res
+
+    def xychain(self, solve=True, verbose=False, maxlength=12):
+        # HYPERADVANCED solving method (grid-based)
+        # an XY-chain is a chain of cells with two candidates (see getbivaluegraph),
+        # in which each cell sees the next one and shares a candidate with it:
+        # if the first cell does not hold a, it holds its other candidate x,
+        # so the second cell does not hold x but its other candidate y, and so on;
+        # if the last cell then holds a, a must be in the first or in the last cell
+        # of the chain, and it can be removed from all other cells that see both
+        # (only chains of at least four cells are considered, as XY-wings are chains of three)
+        # input arguments:
+        # - solve: boolean whether to modify the grid or only return hint
+        # - maxlength: maximum number of cells in a chain
+        # note: the chains are found by a breadth-first search over (cell, value) pairs
+        #       (the value the cell holds if the first cell does not hold a);
+        #       the search from each first cell is kept between calls (see xychainmemo);
+        #       it uses the candidates at the start of the call, which remain valid
+        #       when candidates are removed along the way
+        res = []
+        topology = self.topology
+        graph = self.getbivaluegraph()
+        pairs = dict((index, self.masks[index]) for index in graph)
+        memo = self.xychainmemo()
+        done = set()
+        for start in sorted(graph):
+            for value in masktolist(pairs[start]):
+                if (start, value, maxlength) not in memo:
+                    # search from the first cell holding its candidate other than value
+                    node = (start, (pairs[start] & ~(1 << value)).bit_length()-1)
+                    parent = {node: None}
+                    depth = {node: 1}
+                    queue = deque([node])
+                    while len(queue)>0:
+                        (index, held) = queue.popleft()
+                        if depth[(index, held)]>=maxlength: continue
+                        for other in graph[index]:
+                            if not (pairs[other] >> held) & 1: continue
+                            following = (other, (pairs[other] & ~(1 << held)).bit_length()-1)
+                            if following in parent: continue
+                            parent[following] = (index, held)
+                            depth[following] = depth[(index, held)]+1
+                            queue.append(following)
+                    memo[(start, value, maxlength)] = parent
+                parent = memo[(start, value, maxlength)]
+                for (end, held) in sorted(parent):
+                    if held!=value or end==start: continue
+                    if (min(start, end), max(start, end), value) in done: continue
+                    chain = [end]
+                    node = parent[(end, held)]
+                    while node is not None:
+                        chain.insert(0, node[0])
+                        node = parent[node]
+                    if len(chain)<4: continue
+                    targets = self.commonpeers(value, [start, end])
+                    if len(targets)==0: continue
+                    done.add((min(start, end), max(start, end), value))
+                    if solve:
+                        for index in targets: self.removecandidate(*topology.coords[index], value)
+                    res.append({'method': 'xychain',
+                                'infokeys': ['value','chain','targets'],
+                                'value': value,
+                                'chain': [topology.coords[index] for index in chain],
+                                'targets': [topology.coords[index] for index in targets]})
+                    if verbose: self.logger.debug('Found XY-chain of length {}', len(chain))
         return res
 
+    def templates(self, solve=True, verbose=False):
+        # HYPERADVANCED solving method (grid-based, vectorized)
+        # a template is a placement of a value in every row, column and block
+        # (see templates.py, e.g. 46656 templates for a 9x9 grid);
+        # for each value, only the templates that fit the current candidates are kept:
+        # - the value can be removed from all cells not covered by any remaining template
+        # - the value can be filled in a cell covered by all remaining templates
+        # (only for grid sizes up to templates.maxsize, else nothing is done)
+        # input arguments:
+        # - solve: boolean whether to modify the grid or only return hint
+        # note: when solving, a value is skipped if its positions did not change
+        #       since the last examination (see isdirty)
+        res = []
+        n = self.size
+        if n>maxtemplatesize: return res
+        alltemplates = gettemplates(n)
+        index = gettemplateindex(n)
+        rows = np.arange(n)
+        for value in range(1, n+1):
+            if solve and not self.isdirty(('templates', value), [], values=[value]): continue
+            # cells that may hold the value (only the filled cell in a row where it is filled)
+            allowed = ((np.array(self.masks, dtype=np.int64) >> value) & 1).astype(bool)
+            allowed = allowed.reshape(n,n)
+            filled = (self.grid==value)
+            allowed[filled.any(axis=1)] = filled[filled.any(axis=1)]
+            # (the rows are checked one by one, starting from the templates using
+            #  the allowed cells of the row with the fewest allowed cells,
+            #  so that most templates are discarded early on)
+            order = np.argsort(allowed.sum(axis=1), kind='stable')
+            templates = alltemplates[np.concatenate([index[order[0]][column] for column
+                                                     in np.nonzero(allowed[order[0]])[0]]
+                                                    + [np.zeros(0, dtype=np.intp)])]
+            for row in order[1:]:
+                templates = templates[allowed[row, templates[:,row]]]
+            # (if no template fits, the grid has no solution, which is left to isvalid)
+            if len(templates)==0: continue
+            covered = np.zeros((n,n), dtype=bool)
+            covered[rows, templates] = True
+            unfilled = (self.grid==0)
+            targets = list(zip(*np.nonzero(allowed & unfilled & ~covered)))
+            placed = [(row, int(templates[0,row])) for row in range(n)
+                      if (templates[:,row]==templates[0,row]).all()
+                      and unfilled[row,templates[0,row]]]
+            if len(targets)==0 and len(placed)==0: continue
+            if solve:
+                for (row, column) in targets: self.removecandidate(row, column, value)
+                for (row, column) in placed: self.setcell(row, column, value)
+            res.append({'method': 'templates',
+                        'infokeys': ['value','ntemplates','targets','cells'],
+                        'value': value, 'ntemplates': len(templates),
+                        'targets': [(int(row), int(column)) for (row, column) in targets],
+                        'cells': placed})
+            if verbose: self.logger.debug('Found {} templates for value {}', len(templates), value)
+        return res
 
-    def forcingchain(self, solve=True, verbose=False):
+    def forcingchain(self, solve=True, verbose=False, workers=1, parallelcells=False,
+                     mode='full'):
         # HYPERADVANCED solving method (grid-based)
         # solve for all possibilities of a certain cell and check recurring patterns
         # input arguments:
         # - solve: boolean whether to modify the grid or only return hint
+        # - mode: choose from 'full' (each hypothesis is solved with all other methods),
+        #   'singles' or 'locked' (each hypothesis is only propagated,
+        #   with or without locked candidates, see forcingchainpropagation;
+        #   much faster, but finds fewer patterns)
+        # - workers: number of processes used to evaluate the hypotheses
+        #   (if larger than 1, the hypotheses are solved in a process pool
+        #    without logging, and only the resulting candidates are sent back)
+        # - parallelcells: boolean whether to evaluate the hypotheses of several cells
+        #   (as many as workers) at once, instead of those of one cell at a time;
+        #   the result is the same, but more work may be done than needed
+        # note: as this method is called repeatedly in a solving loop,
+        #       the results of the hypotheses are kept between calls (see forcingchainmemo),
+        #       and when solving, the loop over the cells resumes after the last cell
+        #       for which a pattern was found instead of starting again at the first cell
+        # note: the candidates of the whole grid are handled as a single packed integer
+        #       (see packmasks), and the results of the hypotheses of a cell are combined
+        #       as soon as each of them is available, so that only one of them is kept at once
+        if mode in ['singles','locked']:
+            return self.forcingchainpropagation(solve=solve, verbose=verbose,
+                                                locked=(mode=='locked'))
+        if mode!='full':
+            print('ERROR: forcing chain mode not recognized: '+str(mode))
+            sys.exit()
         res = []
-        if verbose: self.writemessage('Attempting forcing chain...')
+        if verbose: self.logger.debug('Attempting forcing chain...')
+        pool = getpool(workers) if workers>1 else None
+        current = packmasks(self.masks, self.size+1)
+        memo = self.forcingchainmemo(current)
         # loop over all cells in the grid
-        for i in range(self.size):
-            for j in range(self.size):
-                cands = self.candidates[i][j]
-                if len(cands)==1: continue
-                # loop over all candidates for this cell
-                scopies = []
-                for k,cand in enumerate(cands):
-                    # special abortion check
-                    if not self.contin: return [-1]
-                    # make a copy and set the given candidate in the given cell
-                    S = self.copy(logfilename=self.logname+'_'+str(k), appendlogfile=True)
-                    if verbose:
-                        msg = 'Forcing chain: trying out candidate {}'.format(cand)
-                        msg += ' for cell {}'.format((i,j))
-                        self.writemessage(msg)
-                    S.setcell(i, j, cand)
-                    # call solver on the sudoku but disable forcing chain method,
-                    # since only one level of 'guessing' is allowed
-                    # (else it is equivalent to brute force)
-                    S.solve(useforcingchain=False)
-                    scopies.append(S)
-                if len(scopies)==0: continue
-                # find candidates that were removed
-                # in all of the different hypotheses
-                candstoremove = cp.deepcopy(self.candidates)
-                removelist = []
-                useful = False
-                # loop over all other cells than the given cell
-                for ci in range(self.size):
-                    for cj in range(self.size):
-                        if(ci==i and cj==j): continue
-                        # check if any of the copies still contains a given value
-                        # (if so, erase it from candidates that can be removed;
-                        #  only candidates that are not erased,
-                        #  because they are in none of the copies,
-                        #  can effectively be removed)
-                        for scopy in scopies:
-                            for val in scopy.candidates[ci][cj]:
-                                if val in candstoremove[ci][cj]:
-                                    candstoremove[ci][cj].remove(val)
-                        if len(candstoremove[ci][cj])>0:
-                            useful = True
-                            for val in candstoremove[ci][cj]:
-                                removelist.append((ci, cj, val))
-                                if solve: self.removecandidate(ci, cj, val)
-                if useful:
+        cells = [(i,j) for i in range(self.size) for j in range(self.size)
+                 if popcount(self.masks[i*self.size+j])>1]
+        if solve:
+            start = len([(i,j) for (i,j) in cells if i*self.size+j<self.fccursor])
+            cells = cells[start:]+cells[:start]
+        batchsize = workers if (pool is not None and parallelcells) else 1
+        for batchstart in range(0, len(cells), batchsize):
+            batch = cells[batchstart:batchstart+batchsize]
+            # special abortion check
+            if not self.contin: return [-1]
+            if pool is None:
+                unions = [self.forcingchainhypotheses(i, j, current, verbose=verbose, memo=memo)
+                          for (i,j) in batch]
+                if unions[0] is None: return [-1]
+            else:
+                tasks = []
+                keys = []
+                state = self.snapshot()
+                for (i,j) in batch:
+                    for cand in masktolist(self.masks[i*self.size+j]):
+                        if self.memoizedhypothesis(memo, i*self.size+j, cand, current)[0]:
+                            continue
+                        if verbose:
+                            self.logger.debug('Forcing chain: trying out candidate {} for cell {}',
+                                              cand, (i,j))
+                        tasks.append((state, self.backend, self.autopropagate, i, j, cand))
+                        keys.append((i*self.size+j, cand))
+                # (the results are packed integers, stored one by one as they arrive)
+                for key, result in zip(keys, pool.imap(solvehypothesis, tasks)):
+                    memo[key] = result
+                unions = []
+                for (i,j) in batch:
+                    union = 0
+                    for cand in masktolist(self.masks[i*self.size+j]):
+                        result = memo[(i*self.size+j, cand)]
+                        if result is not None: union |= result
+                    unions.append(union)
+            for (i,j), union in zip(batch, unions):
+                # (if all hypotheses lead to a contradiction, the sudoku is invalid)
+                if union==0: continue
+                # find candidates that were removed in all of the different hypotheses,
+                # i.e. that are not in the union of the candidates of the hypotheses
+                # (the given cell itself is not considered)
+                width = self.size+1
+                toremove = current & ~union & ~(((1 << width)-1) << ((i*self.size+j)*width))
+                if toremove:
+                    removelist = []
+                    for index, mask in enumerate(unpackmasks(toremove, width, len(self.masks))):
+                        for val in masktolist(mask):
+                            removelist.append(self.topology.coords[index]+(val,))
+                    if solve:
+                        for (ci, cj, val) in removelist: self.removecandidate(ci, cj, val)
                     res.append({'method': 'forcingchain',
                                 'infokeys': ['cell','results'],
                                 'cell': (i,j), 'results': removelist})
-                    if verbose: self.writemessage('Forcing chain found recurring pattern!')
+                    if verbose: self.logger.debug('Forcing chain found recurring pattern!')
+                    # the next call resumes at the next cell
+                    self.fccursor = (i*self.size+j+1) % (self.size*self.size)
                     # exit the function here
                     # (this is optional; if commented out, a forching chain will be attempted
                     #  for each cell in the grid, but this is inefficient and not needed,
@@ -1015,177 +1859,501 @@ class Sudoku(object):
                     return res
                 else:
                     if verbose:
-                        msg = 'Forcing chain finished for cell {}'.format((i,j))
-                        msg += ' without finding recurring pattern.'
-                        self.writemessage(msg)
+                        self.logger.debug('Forcing chain finished for cell {}'
+                                          +' without finding recurring pattern.', (i,j))
         if verbose:
-            if len(res)!=0: self.writemessage('Forcing chain finished for all cells in grid.')
-            else: self.writemessage('Forcing chain finished whithout finding pattern.')
+            if len(res)!=0: self.logger.debug('Forcing chain finished for all cells in grid.')
+            else: self.logger.debug('Forcing chain finished whithout finding pattern.')
         return res
+
+    def forcingchainpropagation(self, solve=True, verbose=False, locked=False):
+        # HYPERADVANCED solving method (grid-based)
+        # lightweight version of forcingchain, where each hypothesis is only followed by
+        # propagation of singles (see propagate) and optionally locked candidates
+        # (see lockedcandidates), instead of the full solving procedure:
+        # - cells with two candidates are tried first, then cells with more candidates
+        # - if a hypothesis leads to a contradiction, the candidate is removed
+        # - else, the candidates that remain in none of the hypotheses for a cell are removed;
+        #   the remaining hypotheses for a cell are skipped as soon as
+        #   all candidates in the grid remain in at least one of them
+        # input arguments:
+        # - solve: boolean whether to modify the grid or only return hint
+        # - locked: boolean whether to apply lockedcandidates after propagation
+        # (like forcingchain, this returns at the first cell for which a pattern is found)
+        res = []
+        if verbose: self.logger.debug('Attempting forcing chain (propagation only)...')
+        ncells = self.topology.ncells
+        width = self.size+1
+        cells = sorted((popcount(self.masks[index]), index) for index in range(ncells)
+                       if popcount(self.masks[index])>1)
+        if len(cells)==0: return res
+        current = packmasks(self.masks, width)
+        # a single (silent) copy is used for all hypotheses,
+        # restored to the current state before trying each of them
+        S = self.copy(verbose=False)
+        S.autopropagate = True
+        state = self.snapshot()
+        for (ncands, index) in cells:
+            # special abortion check
+            if not self.contin: return [-1]
+            (i,j) = self.topology.coords[index]
+            # union of the candidates remaining in the hypotheses so far
+            # (including all candidates of the given cell itself)
+            union = self.masks[index] << (index*width)
+            for cand in masktolist(self.masks[index]):
+                S.restore(state)
+                S.setcell(i, j, cand)
+                S.propagate()
+                while locked and S.nunfilled>0 and S.isvalid():
+                    nprev = S.ncands
+                    S.lockedcandidates()
+                    if S.ncands==nprev: break
+                if not S.isvalid():
+                    res.append({'method': 'forcingchaincontradiction',
+                                'infokeys': ['cell','value'],
+                                'cell': (i,j), 'value': cand})
+                    if solve: self.removecandidate(i, j, cand)
+                    if verbose: self.logger.debug('Forcing chain: candidate {} for cell {}'
+                                                  +' leads to a contradiction', cand, (i,j))
+                    return res
+                union |= packmasks(S.masks, width)
+                if not current & ~union: break
+            toremove = current & ~union
+            if toremove:
+                removelist = []
+                for k, mask in enumerate(unpackmasks(toremove, width, ncells)):
+                    for val in masktolist(mask):
+                        removelist.append(self.topology.coords[k]+(val,))
+                if solve:
+                    for (ci, cj, val) in removelist: self.removecandidate(ci, cj, val)
+                res.append({'method': 'forcingchain',
+                            'infokeys': ['cell','results'],
+                            'cell': (i,j), 'results': removelist})
+                if verbose: self.logger.debug('Forcing chain found recurring pattern!')
+                return res
+        if verbose and len(res)==0:
+            self.logger.debug('Forcing chain (propagation only) finished without finding pattern.')
+        return res
+
+    def forcingchainmemo(self, current):
+        # helper function for forcingchain:
+        # get the results of the hypotheses evaluated in previous calls, as a dict
+        # mapping (cell index, candidate) to the resulting candidates packed in an integer
+        # (see packmasks; or None if the hypothesis leads to a contradiction);
+        # these remain useful as long as candidates are only removed,
+        # so the dict is cleared if any candidate was added since the previous call
+        # (e.g. by undo or restore)
+        # input arguments:
+        # - current: the current candidates packed in an integer
+        if self.fcbase is not None and current & ~self.fcbase: self.fcmemo = {}
+        self.fcbase = current
+        return self.fcmemo
+
+    def memoizedhypothesis(self, memo, index, cand, current):
+        # helper function for forcingchain:
+        # check whether the memoized result of setting a candidate in a cell still applies;
+        # since the solving methods only remove candidates, solving the hypothesis again
+        # gives the same result if all candidates removed since it was obtained
+        # were already absent from it (a contradiction remains a contradiction)
+        # returns:
+        #   a tuple (boolean whether the result applies, the result)
+        key = (index, cand)
+        if key not in memo: return (False, None)
+        result = memo[key]
+        if result is not None and result & ~current:
+            del memo[key]
+            return (False, None)
+        return (True, result)
+
+    def forcingchainhypotheses(self, i, j, current, verbose=False, memo=None):
+        # helper function for forcingchain:
+        # solve a copy of the sudoku for each candidate of cell (i,j) and return the union
+        # of the resulting candidates of the copies that do not lead to a contradiction,
+        # packed in an integer (see packmasks; 0 if all hypotheses lead to a contradiction,
+        # or None if the solving process was aborted)
+        # input arguments:
+        # - current: the current candidates packed in an integer
+        # - memo: optional dict of results of previous calls (see forcingchainmemo),
+        #   used for the candidates where they still apply and updated for the others
+        # note: the union is updated after each hypothesis, and the remaining hypotheses
+        #       are skipped as soon as it contains all current candidates
+        #       (as nothing can be removed then)
+        index = i*self.size+j
+        width = self.size+1
+        cellbits = ((1 << width)-1) << (index*width)
+        union = 0
+        # a single (silent) copy is used for all candidates,
+        # restored to the current state before trying each of them
+        S = None
+        for cand in masktolist(self.masks[index]):
+            # special abortion check
+            if not self.contin: return None
+            (applies, result) = (False, None)
+            if memo is not None:
+                (applies, result) = self.memoizedhypothesis(memo, index, cand, current)
+            if not applies:
+                if S is None:
+                    S = self.copy(verbose=False)
+                    state = self.snapshot()
+                # set the given candidate in the given cell
+                S.restore(state)
+                S.contin = self.contin
+                if verbose:
+                    self.logger.debug('Forcing chain: trying out candidate {} for cell {}',
+                                      cand, (i,j))
+                S.setcell(i, j, cand)
+                # call solver on the sudoku but disable forcing chain method,
+                # since only one level of 'guessing' is allowed
+                # (else it is equivalent to brute force)
+                S.solve(useforcingchain=False)
+                # (a hypothesis leading to a contradiction does not restrict the other cells)
+                result = packmasks(S.masks, width) if S.isvalid() else None
+                if memo is not None: memo[(index, cand)] = result
+            if result is None: continue
+            union |= result
+            if not current & ~union & ~cellbits: break
+        return union
                     
 
     def solve_basic(self, verbose=False):
         ### helper function for full solver
         # including only basic solving methods
         # repeated in a loop until no further reduction is possible
+        if self.backend=='numpy': return self.solve_basic_numpy(verbose=verbose)
+        if self.autopropagate:
+            # all consequences of filled cells and removed candidates are tracked in the queue,
+            # so there is no need to loop over the full grid
+            self.propagate()
+            if verbose: self.logger.debug('Number of remaining candidates: {}', self.ncands)
+            return self.ncands
         ncands = self.ncands
         self.reducecandidates(verbose=verbose)
         self.loopgroups(['complement'], verbose=verbose)
-        if verbose: self.writemessage('Number of remaining candidates: '+str(self.ncands))
-        while self.ncands < ncands and self.nunfilled>0:
+        if verbose: self.logger.debug('Number of remaining candidates: {}', self.ncands)
+        while self.ncands < ncands and self.nunfilled>0 and self.isvalid():
             ncands = self.ncands
             self.reducecandidates(verbose=verbose)
             self.loopgroups(['complement'], verbose=verbose)
-            if verbose: self.writemessage('Number of remaining candidates: '+str(self.ncands))
+            if verbose: self.logger.debug('Number of remaining candidates: {}', self.ncands)
         return ncands
 
+    def solve_basic_numpy(self, verbose=False):
+        ### vectorized alternative to solve_basic
+        # performs the same basic solving methods ('sole candidate' and 'unique candidate')
+        # on a boolean candidate tensor, treating all rows, columns and blocks at once;
+        # the result is written back to the grid and candidates at the end
+        n = self.size
+        b = self.blocksize
+        cands = self.getcandidatetensor()
+        grid = np.copy(self.grid)
+        while True:
+            nprev = cands.sum()
+            # sole candidate: remove values that are present in the row, column or block
+            unfilled = (grid==0)
+            placed = cands & ~unfilled[:,:,np.newaxis]
+            rowhas = placed.any(axis=1)
+            columnhas = placed.any(axis=0)
+            blockhas = placed.reshape(b,b,b,b,n).any(axis=3).any(axis=1)
+            blockhas = blockhas.repeat(b,axis=0).repeat(b,axis=1)
+            present = rowhas[:,np.newaxis,:] | columnhas[np.newaxis,:,:] | blockhas
+            cands &= ~(present & unfilled[:,:,np.newaxis])
+            # cells with a single remaining candidate are filled
+            newcells = []
+            rows, columns = np.nonzero(unfilled & (cands.sum(axis=2)==1))
+            for row, column in zip(rows, columns):
+                newcells.append((row, column, cands[row,column].argmax()+1))
+            # unique candidate: values with only one position in a row, column or block
+            # (ignoring values that are already present in that group)
+            rows, values = np.nonzero((cands.sum(axis=1)==1) & ~rowhas)
+            for row, value in zip(rows, values):
+                newcells.append((row, cands[row,:,value].argmax(), value+1))
+            columns, values = np.nonzero((cands.sum(axis=0)==1) & ~columnhas)
+            for column, value in zip(columns, values):
+                newcells.append((cands[:,column,value].argmax(), column, value+1))
+            blockcands = cands.reshape(b,b,b,b,n).transpose(0,2,1,3,4).reshape(n,n,n)
+            blockhas = blockhas[::b,::b].reshape(n,n)
+            blocks, values = np.nonzero((blockcands.sum(axis=1)==1) & ~blockhas)
+            for block, value in zip(blocks, values):
+                (row, column) = self.getcell('block', block, blockcands[block,:,value].argmax())
+                newcells.append((row, column, value+1))
+            for (row, column, value) in newcells:
+                if grid[row,column]!=0: continue
+                grid[row,column] = value
+                cands[row,column,:] = False
+                cands[row,column,value-1] = True
+            if len(newcells)==0 and cands.sum()==nprev: break
+        # (the tensor is fully reduced, so pending propagation events can be discarded)
+        autopropagate = self.autopropagate
+        self.autopropagate = False
+        self.setcandidatetensor(cands)
+        self.autopropagate = autopropagate
+        self.queue.clear()
+        if verbose: self.logger.debug('Number of remaining candidates: {}', self.ncands)
+        return self.ncands
+
+    def runstep(self, name, verbose=False):
+        # run a single solving step by name (see techniquecosts)
+        if name=='basic': self.solve_basic(verbose=verbose)
+        elif name=='lockedcandidates': self.lockedcandidates(verbose=verbose)
+        elif name in ['nakedsubset','hiddensubset']: self.loopgroups([name], verbose=verbose)
+        elif name=='swordfishcolumns': self.swordfishcolumns(verbose=verbose)
+        elif name=='swordfishrows': self.swordfishrows(verbose=verbose)
+        elif name=='xywing': self.xywing(verbose=verbose)
+        elif name=='xyzwing': self.xyzwing(verbose=verbose)
+        elif name=='uniquerectangle': self.uniquerectangle(verbose=verbose)
+        elif name=='skyscraper': self.skyscraper(verbose=verbose)
+        elif name=='twostringkite': self.twostringkite(verbose=verbose)
+        elif name=='simplecoloring': self.simplecoloring(verbose=verbose)
+        elif name=='xchain': self.xchain(verbose=verbose)
+        elif name=='remotepair': self.remotepair(verbose=verbose)
+        elif name=='xychain': self.xychain(verbose=verbose)
+        elif name=='templates': self.templates(verbose=verbose)
+        else:
+            print('ERROR: solving step not recognized: '+str(name))
+            sys.exit()
+
+    def runtechniques(self, names, verbose=False):
+        ### helper function for full solver
+        # apply a list of solving steps until none of them removes any further candidates;
+        # the steps are tried in the order given by the scheduler (cheapest first),
+        # and after each step that removes candidates, the order is updated
+        # and the steps are tried again from the cheapest one
+        # returns: the number of remaining candidates
+        while self.nunfilled>0 and self.isvalid():
+            progress = False
+            for name in self.scheduler.order(names):
+                ncands = self.ncands
+                starttime = time.perf_counter()
+                self.runstep(name, verbose=verbose)
+                self.scheduler.record(name, time.perf_counter()-starttime, ncands-self.ncands)
+                if self.ncands<ncands:
+                    progress = True
+                    if verbose: self.logger.debug('Number of remaining candidates: {}', self.ncands)
+                    break
+            if not progress: break
+        return self.ncands
+
     def solve_advanced(self, verbose=False):
         ### helper function for full solver
         # including solving methods up to advanced level
-        # repeated in a loop until no further reduction is possible
-        ncands = self.ncands
-        self.solve_basic(verbose=verbose)
-        self.loopgroups(['nakedsubset','hiddensubset','blocklineinteraction',
-                         'lineblockinteraction','blockblockinteraction'],
-                         verbose=verbose)
-        self.solve_basic(verbose=verbose)
-        if verbose: self.writemessage('Number of remaining candidates: '+str(self.ncands))
-        while self.ncands < ncands and self.nunfilled>0:
-            ncands = self.ncands
-            self.loopgroups(['nakedsubset','hiddensubset','blocklineinteraction',
-                             'lineblockinteraction','blockblockinteraction'],
-                             verbose=verbose)
-            self.solve_basic(verbose=verbose)
-            if verbose: self.writemessage('Number of remaining candidates: '+str(self.ncands))
-        return ncands
+        # applied until no further reduction is possible (see runtechniques)
+        return self.runtechniques(advancedsteps, verbose=verbose)
 
     def solve_hyperadvanced(self, verbose=False):
         ### helper function for full solver
         # including solving methods up to hyperadvanced level (but no forcing chain yet)
-        # repeated in a loop until no further reduction is possible
-        ncands = self.ncands
-        self.solve_advanced(verbose=verbose)
-        self.swordfishcolumns(verbose=verbose)
-        self.swordfishrows(verbose=verbose)
-        self.xywing(verbose=verbose)
-        self.uniquerectangle(verbose=verbose)
-        self.solve_advanced(verbose=verbose)
-        if verbose: self.writemessage('Number of remaining candidates: '+str(self.ncands))
-        while self.ncands < ncands and self.nunfilled>0:
-            ncands = self.ncands
-            self.swordfishcolumns(verbose=verbose)
-            self.swordfishrows(verbose=verbose)
-            self.xywing(verbose=verbose)
-            self.uniquerectangle(verbose=verbose)
-            self.solve_advanced(verbose=verbose)
-            if verbose: self.writemessage('Number of remaining candidates: '+str(self.ncands))
-
-    def solve(self, useforcingchain=True, usebruteforce=False, recursiondepth=0):
+        # applied until no further reduction is possible (see runtechniques)
+        return self.runtechniques(hyperadvancedsteps, verbose=verbose)
+
+    def solve_forcingchain(self, verbose=False, workers=1, parallelcells=False):
+        ### helper function for full solver
+        # a single step of forcing chain followed by the hyperadvanced methods;
+        # the lightweight forcing chain (propagation and locked candidates) is tried first,
+        # and the full forcing chain is used as exhaustive fallback if it finds nothing
+        res = self.forcingchain(verbose=verbose, mode='locked')
+        if len(res)==0:
+            self.forcingchain(verbose=verbose, workers=workers, parallelcells=parallelcells)
+        self.solve_hyperadvanced(verbose=verbose)
+
+    def solve(self, useforcingchain=True, usebruteforce=False, method='techniques',
+              workers=1, parallelcells=False):
         ### main method grouping all solving methods 
         ### and calling them in increasing order of complexity
         # - useforcingchain: boolean whether to use forcing chain method
         #   (is set to false when calling solve from forcing chain 
         #    since only one recursion level allowed)
         # - usebruteforce: boolean whether to use brute force method
-        # - recursiondepth: int representing level of recursion,
-        #   in order to prevent infinite recursion loop for insolvable sudokus
-        #   (only used for brute force solving method)
+        # - workers and parallelcells: options for parallel evaluation
+        #   of the forcing chain hypotheses (see forcingchain)
+        # - method: choose from 'techniques' (human-like solving methods, see above)
+        #   or 'dlx' (exact cover search using dancing links, see solve_dlx)
+
+        if method=='dlx': return self.solve_dlx()
+        if method!='techniques':
+            print('ERROR: solving method not recognized: '+str(method))
+            sys.exit()
 
-        self.writemessage('Start solving method on the following sudoku:'+'\n'+self.tostring())
+        log = self.logger
+        log.info('Start solving method on the following sudoku:\n{}', self.tostring)
         ncands = self.ncands # use ncands to keep track of changes made by each method
-        self.writemessage('number of initial candidates: '+str(ncands))
+        log.info('number of initial candidates: {}', ncands)
         # STEP 1: basic methods
-        self.writemessage('Starting solving procedure using basic methods...')
+        log.info('Starting solving procedure using basic methods...')
         self.solve_basic(verbose=True)
-        self.writemessage('Basic methods finished.\n')
-        (outputcode,message) = self.terminate()
-        if outputcode!=0: return (outputcode,message)
+        log.info('Basic methods finished.\n')
+        if self.getstatus()!=0: return self.terminate()
+        log.info('The sudoku at this point:\n{}', self.tostring)
         # STEP 2: advanced methods
-        self.writemessage('Start using more advanced methods...')
+        log.info('Start using more advanced methods...')
         self.solve_advanced(verbose=True)
-        self.writemessage('Advanced methods finished.\n')
-        (outputcode,message) = self.terminate()
-        if outputcode!=0: return (outputcode,message)
+        log.info('Advanced methods finished.\n')
+        if self.getstatus()!=0: return self.terminate()
+        log.info('The sudoku at this point:\n{}', self.tostring)
         # STEP 3: hyperadvanced methods
-        self.writemessage('Start using hyperadvanced methods...')
+        log.info('Start using hyperadvanced methods...')
         self.solve_hyperadvanced(verbose=True)
-        self.writemessage('Hyperadvanced methods finished.\n')
-        (outputcode,message) = self.terminate()
-        if outputcode!=0: return (outputcode,message)
+        log.info('Hyperadvanced methods finished.\n')
+        if self.getstatus()!=0: return self.terminate()
         # STEP 4: forcing chain
         if useforcingchain:
-            self.writemessage('Start using forcing chain...')
+            log.info('The sudoku at this point:\n{}', self.tostring)
+            log.info('Start using forcing chain...')
             ncands = self.ncands
-            self.forcingchain(verbose=True)
-            self.solve_hyperadvanced(verbose=True)
-            while self.ncands < ncands and self.nunfilled>0:
+            self.solve_forcingchain(verbose=True, workers=workers, parallelcells=parallelcells)
+            while self.ncands < ncands and self.nunfilled>0 and self.isvalid():
                 ncands = self.ncands
-                self.forcingchain(verbose=True)
-                self.solve_hyperadvanced(verbose=True)
-            (outputcode,message) = self.terminate()
-            if outputcode!=0: return (outputcode,message)
+                self.solve_forcingchain(verbose=True, workers=workers, parallelcells=parallelcells)
+            if self.getstatus()!=0: return self.terminate()
         # STEP 5: give up or use brute force
-        msg = 'Unable to solve sudoku with presently implemented methods...\n'
-        msg += 'Got up to this point: \n'
-        msg += self.tostring()
-        self.writemessage(msg)
-        if not usebruteforce: return (outputcode,message)
-        if recursiondepth>10: 
-            self.writemessage('Maximum recursion depth reached')
-            return (outputcode,message)
-        self.writemessage('Starting brute force methods...')
-        (outcode,message) = self.solvebruteforce(recursiondepth=recursiondepth)
+        if not usebruteforce: return self.terminate()
+        log.info('Unable to solve sudoku with presently implemented methods...\n'
+                 +'Got up to this point: \n{}', self.tostring)
+        log.info('Starting brute force methods...')
+        (outcode,message) = self.solvebruteforce()
         return (outcode,message)
 
-    def solvebruteforce(self, recursiondepth=0):
-        # fill a cell by random guessing and recursively call solver
+    def getexactcover(self):
+        ### formulate the sudoku as an exact cover problem
+        # columns (constraints): each cell has one value, each row, column and block
+        # contains each value once (4*size*size columns in total);
+        # rows (options): each remaining candidate value for each cell
+        # returns:
+        #   a DancingLinks object and a list of (row, column, value) tuples for each option
+        n = self.size
+        ncells = n*n
+        rows = []
+        options = []
+        for index in range(ncells):
+            (row, column) = self.topology.coords[index]
+            block = self.topology.cellblock[index]
+            if self.grid[row,column]!=0: values = [int(self.grid[row,column])]
+            else: values = masktolist(self.masks[index])
+            for value in values:
+                options.append((row, column, value))
+                rows.append([index, ncells+row*n+value-1,
+                             2*ncells+column*n+value-1, 3*ncells+block*n+value-1])
+        return (DancingLinks(4*ncells, rows), options)
+
+    def countsolutions(self, maxsolutions=None):
+        # count the number of solutions of the sudoku (starting from the current candidates)
+        # by exact cover search, stopping after maxsolutions (if not None)
+        (dlx, _) = self.getexactcover()
+        nsolutions = 0
+        for solution in dlx.search():
+            nsolutions += 1
+            if maxsolutions is not None and nsolutions>=maxsolutions: break
+        return nsolutions
 
-        # find (one of) the cell(s) with minimum number of candidates
-        rowmin = 0; colmin = 0; candmin = self.size+1
-        for i in range(self.size):
-            for j in range(self.size):
-                ncands = len(self.candidates[i][j])
-                if(ncands<candmin and ncands>=2):
-                    candmin = len(self.candidates[i][j])
-                    rowmin = i; colmin = j
-        # loop over candidates for this minimum-candidate cell
-        for cand in self.candidates[rowmin][colmin]:
-            self.writemessage(
-                'row and column indices of cell with least candidates: '
-                + str(rowmin)+','+str(colmin)+'\n'
-                + 'candidates are: '+str(self.candidates[rowmin][colmin])+'\n'
-                + 'now trying: '+str(cand)+'\n')
-            # make a copy and set the cell to this candidate
-            S = self.copy(logfilename=self.logname, appendlogfile=True)
-            S.setcell(rowmin, colmin, cand)
-            (outcode,message) = S.solve(usebruteforce=True, recursiondepth=recursiondepth+1)
-            # if this leads to the correct solution, return
-            if outcode==1:
-                self.set(S)
-                return (outcode,message)
-        # if none of the above led to the correct solution,
-        # a mistake must have been made in one of the previous steps
-        return (-1,'All options invalid, go one step back...')
+    def solve_dlx(self, maxsolutions=2):
+        ### alternative to the full solver using an exact cover search with dancing links
+        # (no human-like solving methods, but fast for any supported grid size)
+        # the grid is filled with the first solution found;
+        # the number of solutions (counted up to maxsolutions, use None for no limit)
+        # is stored in self.nsolutions
+        self.logger.info('Start exact cover solving method on the following sudoku:\n{}',
+                         self.tostring)
+        # the search is stopped as soon as the abortion flag is set (see setbreak)
+        (dlx, options) = self.getexactcover()
+        self.nsolutions = 0
+        solution = None
+        for rows in dlx.search(abort=lambda: not self.contin):
+            if solution is None: solution = rows
+            self.nsolutions += 1
+            if maxsolutions is not None and self.nsolutions>=maxsolutions: break
+        if solution is None and not self.contin:
+            # (aborted before the first solution was found, so nothing is known)
+            self.nsolutions = None
+            self.logger.result('Exact cover solving method was aborted')
+            return self.terminate()
+        if solution is None:
+            message = 'ERROR: sudoku has no solution \n'
+            self.logger.result(message)
+            self.logger.flush()
+            return (-1,message)
+        for rowindex in solution:
+            (row, column, value) = options[rowindex]
+            self.setcell(row, column, value)
+        more = ' (or more)' if maxsolutions is not None and self.nsolutions>=maxsolutions else ''
+        if not self.contin and more=='': more = ' (search aborted, there may be more)'
+        self.logger.result('Number of solutions found: {}{}', self.nsolutions, more)
+        (outputcode,message) = self.terminate()
+        if self.nsolutions>1:
+            message = 'WARNING: sudoku has multiple solutions, showing one of them.\n'+message
+        return (outputcode,message)
+
+    def solvebruteforce(self):
+        # fill cells by guessing, in an iterative depth-first search
+        # after each guess, the solving methods up to hyperadvanced level are applied;
+        # all changes are recorded in self.trail, so that a wrong guess can be reverted
+        # by undoing only the changes made since that guess (instead of copying the sudoku)
+        # note: the forcing chain is not used during the search,
+        #       as it is itself a (limited) form of guessing
+        self.trail = []
+        stack = [] # list of [trail position, row, column, remaining candidates] for each guess
+        try:
+            while True:
+                # special abortion check
+                if not self.contin:
+                    self.undo(0)
+                    return (0,'Brute force search was aborted.')
+                # (the solving methods are skipped if the last guess already gave a contradiction)
+                if self.isvalid(): self.solve_hyperadvanced()
+                if self.nunfilled==0 and self.isvalid(): break
+                if not self.isvalid():
+                    # contradiction: go back to the last guess with remaining candidates
+                    while len(stack)>0 and len(stack[-1][3])==0: stack.pop()
+                    if len(stack)==0:
+                        self.undo(0)
+                        self.logger.result('All options invalid, sudoku has no solution.')
+                        return (-1,'ERROR: sudoku has no solution \n')
+                else:
+                    # find (one of) the cell(s) with minimum number of candidates
+                    rowmin = 0; colmin = 0; candmin = self.size+1
+                    for index in range(self.topology.ncells):
+                        ncands = popcount(self.masks[index])
+                        if(ncands<candmin and ncands>=2):
+                            candmin = ncands
+                            (rowmin, colmin) = self.topology.coords[index]
+                    cands = masktolist(self.masks[rowmin*self.size+colmin])
+                    self.logger.debug('row and column indices of cell with least candidates: '
+                                      +'{},{}\ncandidates are: {}\n', rowmin, colmin, cands)
+                    stack.append([len(self.trail), rowmin, colmin, cands])
+                # set the cell of the last guess to its next candidate
+                (position, row, column, cands) = stack[-1]
+                self.undo(position)
+                cand = cands.pop(0)
+                self.logger.debug('now trying: {} in cell {}\n', cand, (row, column))
+                self.setcell(row, column, cand)
+        finally:
+            self.trail = None
+            self.logger.flush()
+        return self.terminate()
         
+    def getstatus(self):
+        # get the output code of terminate (see below) without making a message
+        if not self.isvalid(): return -1
+        if self.nunfilled==0: return 1
+        return 0
+
     def terminate(self):
         # check termination conditions and print final output to screen
+        # (the log file is flushed, as this is called at the end of each solving method)
         # output codes:
         #       -1: invalid sudoku detected, stop processing
         #       0: sudoku partially solved, continue processing
         #       1: sudoku fully solved, stop processing
-        if not self.isvalid():
+        outputcode = self.getstatus()
+        if outputcode==-1:
             message = 'ERROR: sudoku is invalid \n'
             message += '-> when running in brute force mode, this is part of the standard workflow \n'
             message += '-> if not, check solving methods for bugs or input for typos!\n'
-            self.writemessage(message)
-            return (-1,message)
-        if self.nunfilled==0:
+        elif outputcode==1:
             message = 'Sudoku was solved successfully!\n'+self.tostring()
-            self.writemessage(message)
-            return (1,message)
-        message = 'The sudoku at this point:\n'+self.tostring()
-        self.writemessage(message)
-        return (0,message)
+        else:
+            message = 'The sudoku at this point:\n'+self.tostring()
+        self.logger.result(message)
+        self.logger.flush()
+        return (outputcode,message)
     
     def tostring(self):
         # useful method for printing the grid in readable format
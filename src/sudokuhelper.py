@@ -1,20 +1,22 @@
 # imports
-from sudoku import Sudoku
-import copy as cp
+from sudoku import Sudoku, listtomask, popcount
 
 class SudokuHelper(Sudoku):
 
     def __init__(self, grid, candidates,
             verbose=True, logfilename=None, appendlogfile=False):
+        # (automatic propagation is disabled so that hints are given one step at a time)
         super(SudokuHelper,self).__init__(grid,
-                verbose=verbose, logfilename=logfilename, appendlogfile=appendlogfile)
-        self.candidates = cp.deepcopy(candidates)
+                verbose=verbose, logfilename=logfilename, appendlogfile=appendlogfile,
+                autopropagate=False)
+        self.candidates = candidates
         self.ncands = 0
         for i in range(self.size):
             for j in range(self.size):
                 if not self.grid[i,j]==0: 
-                    self.candidates[i][j] = [grid[i,j]]
-                self.ncands += len(self.candidates[i][j])
+                    self.masks[i*self.size+j] = listtomask([grid[i,j]])
+                self.ncands += popcount(self.masks[i*self.size+j])
+        self.recount()
 
     def hint(self):
         # STEP 1: basic methods
@@ -23,10 +25,12 @@ class SudokuHelper(Sudoku):
         res = self.loopgroups(['complement'],solve=False)
         if len(res)>0: return self.showhint(res[0])
         # STEP 2: advanced methods
-        for method in (['nakedsubset','hiddensubset','blocklineinteraction',
-                        'lineblockinteraction','blockblockinteraction']):
+        for method in ['nakedsubset','hiddensubset']:
             res = self.loopgroups([method],solve=False)
             if len(res)>0: return self.showhint(res[0])
+        for method in ['blocklineinteraction','lineblockinteraction','blockblockinteraction']:
+            res = self.lockedcandidates([method],solve=False)
+            if len(res)>0: return self.showhint(res[0])
         # STEP 3: hyperadvanced methods
         res = self.swordfishcolumns(solve=False)
         if len(res)>0: return self.showhint(res[0])
@@ -34,8 +38,16 @@ class SudokuHelper(Sudoku):
         if len(res)>0: return self.showhint(res[0])
         res = self.xywing(solve=False)
         if len(res)>0: return self.showhint(res[0])
-        #res = self.uniquerectangle(solve=False)
-        #if len(res)>0: return self.showhint(res[0])
+        res = self.xyzwing(solve=False)
+        if len(res)>0: return self.showhint(res[0])
+        res = self.uniquerectangle(solve=False)
+        if len(res)>0: return self.showhint(res[0])
+        for method in [self.skyscraper, self.twostringkite, self.simplecoloring, self.xchain,
+                       self.remotepair, self.xychain, self.templates]:
+            res = method(solve=False)
+            if len(res)>0: return self.showhint(res[0])
+        res = self.forcingchain(solve=False, mode='locked')
+        if len(res)>0: return self.showhint(res[0])
         res = self.forcingchain(solve=False)
         if len(res)>0: return self.showhint(res[0])
         return ('No hint could be found!\n\n',[])
@@ -132,15 +144,107 @@ class SudokuHelper(Sudoku):
             hint += '        a group (row, column or block) with both wings.\n\n'
             cells = resdict['cells']
         
+        elif resdict['method']=='xyzwing':
+            hint += 'There is an XYZ-wing pattern.\n'
+            hint += '        The base is cell '+self.printcell(resdict['cells'][0])+' and the wings are\n'
+            hint += '        cells '+self.printcell(resdict['cells'][1])+' and '
+            hint += self.printcell(resdict['cells'][2])+'.\n'
+            hint += '        You can remove candidate '+str(resdict['value'])+' from all cells that share\n'
+            hint += '        a group (row, column or block) with the base and both wings.\n\n'
+            cells = resdict['cells']
+        
         elif resdict['method']=='uniquerectangle':
-            hint += 'There is a unique rectangle pattern.\n'
-            hint += '        The base cells are '+self.printcell(resdict['cells'][0])
+            hint += 'There is a unique rectangle pattern (type '+str(resdict['type'])+').\n'
+            hint += '        The corner cells are '+self.printcell(resdict['cells'][0])
             hint += ', '+self.printcell(resdict['cells'][1])
-            hint += ' and '+self.printcell(resdict['cells'][2])+'\n'
-            hint += '        You can remove candidates '+str(resdict['values'])
-            hint += ' from target cell '+self.printcell(resdict['target'])+'.\n\n'
+            hint += ', '+self.printcell(resdict['cells'][2])
+            hint += ' and '+self.printcell(resdict['cells'][3])+'.\n'
+            hint += '        If they could only hold the candidates '+str(resdict['pair'])+',\n'
+            hint += '        the sudoku would not have a unique solution.\n'
+            hint += '        You can remove candidates '+str(resdict['values'])+' from cells '
+            hint += ', '.join([self.printcell(c) for c in resdict['targets']])+'.\n\n'
             cells = resdict['cells']
         
+        elif resdict['method']=='skyscraper':
+            otherlabel = 'column' if resdict['linelabel']=='row' else 'row'
+            hint += 'There is a skyscraper pattern for candidate '+str(resdict['value'])+'.\n'
+            hint += '        In two '+resdict['linelabel']+'s, the candidate is only in two cells,\n'
+            hint += '        and the cells '+self.printcell(resdict['cells'][0])+' and '
+            hint += self.printcell(resdict['cells'][2])+' are in the same '+otherlabel+',\n'
+            hint += '        so the candidate must be in cell '+self.printcell(resdict['cells'][1])
+            hint += ' or '+self.printcell(resdict['cells'][3])+'.\n'
+            hint += '        You can remove it from cells '
+            hint += ', '.join([self.printcell(c) for c in resdict['targets']])+'.\n\n'
+            cells = resdict['cells']
+
+        elif resdict['method']=='twostringkite':
+            hint += 'There is a 2-string kite pattern for candidate '+str(resdict['value'])+'.\n'
+            hint += '        The candidate is only in two cells of a row and of a column,\n'
+            hint += '        and the cells '+self.printcell(resdict['cells'][1])+' and '
+            hint += self.printcell(resdict['cells'][2])+' are in the same block,\n'
+            hint += '        so the candidate must be in cell '+self.printcell(resdict['cells'][0])
+            hint += ' or '+self.printcell(resdict['cells'][3])+'.\n'
+            hint += '        You can remove it from cells '
+            hint += ', '.join([self.printcell(c) for c in resdict['targets']])+'.\n\n'
+            cells = resdict['cells']
+
+        elif resdict['method']=='simplecoloring':
+            hint += 'A simple coloring pattern for candidate '+str(resdict['value'])+' was found.\n'
+            hint += '        The candidate is either in all cells '
+            hint += ', '.join([self.printcell(c) for c in resdict['color1']])+'\n'
+            hint += '        or in all cells '
+            hint += ', '.join([self.printcell(c) for c in resdict['color2']])+'.\n'
+            hint += '        You can remove it from cells '
+            hint += ', '.join([self.printcell(c) for c in resdict['targets']])+'.\n\n'
+            cells = resdict['color1']+resdict['color2']
+
+        elif resdict['method']=='xchain':
+            hint += 'There is an X-chain for candidate '+str(resdict['value'])+'.\n'
+            hint += '        Along the chain '
+            hint += ' - '.join([self.printcell(c) for c in resdict['chain']])+',\n'
+            hint += '        the candidate is alternately absent and present,\n'
+            hint += '        so it must be in the first or in the last cell of the chain.\n'
+            hint += '        You can remove it from cells '
+            hint += ', '.join([self.printcell(c) for c in resdict['targets']])+'.\n\n'
+            cells = resdict['chain']
+
+        elif resdict['method']=='remotepair':
+            hint += 'There is a remote pair chain with candidates '+str(resdict['pair'])+'.\n'
+            hint += '        Along the chain, the cells alternately hold one candidate and the other,\n'
+            hint += '        so one of them is in all cells '
+            hint += ', '.join([self.printcell(c) for c in resdict['color1']])+'\n'
+            hint += '        and the other one in all cells '
+            hint += ', '.join([self.printcell(c) for c in resdict['color2']])+'.\n'
+            hint += '        You can remove both candidates from cells '
+            hint += ', '.join([self.printcell(c) for c in resdict['targets']])+'.\n\n'
+            cells = resdict['color1']+resdict['color2']
+
+        elif resdict['method']=='xychain':
+            hint += 'There is an XY-chain for candidate '+str(resdict['value'])+'.\n'
+            hint += '        Along the chain '
+            hint += ' - '.join([self.printcell(c) for c in resdict['chain']])+',\n'
+            hint += '        if the first cell does not hold the candidate, each cell forces\n'
+            hint += '        the value of the next one, and the last cell holds the candidate,\n'
+            hint += '        so it must be in the first or in the last cell of the chain.\n'
+            hint += '        You can remove it from cells '
+            hint += ', '.join([self.printcell(c) for c in resdict['targets']])+'.\n\n'
+            cells = resdict['chain']
+
+        elif resdict['method']=='templates':
+            hint += 'Only '+str(resdict['ntemplates'])+' ways to place candidate '
+            hint += str(resdict['value'])+' in every row, column and block\n'
+            hint += '        fit the current candidates.\n'
+            if len(resdict['targets'])>0:
+                hint += '        None of them uses cells '
+                hint += ', '.join([self.printcell(c) for c in resdict['targets']])+',\n'
+                hint += '        so you can remove the candidate from these cells.\n'
+            if len(resdict['cells'])>0:
+                hint += '        All of them use cells '
+                hint += ', '.join([self.printcell(c) for c in resdict['cells']])+',\n'
+                hint += '        so you can fill in the candidate in these cells.\n'
+            hint += '\n'
+            cells = resdict['targets']+resdict['cells']
+
         elif resdict['method']=='forcingchain':
             hint += 'A forcing chain method was used.\n'
             hint += '        Cell '+self.printcell(resdict['cell'])+' can hold different numbers,\n'
@@ -149,6 +253,13 @@ class SudokuHelper(Sudoku):
                 hint += '        candidate '+str(c[2])+' in cell '+self.printcell((c[0],c[1]))+'\n'
             hint += '\n'
             cells = resdict['results']
+
+        elif resdict['method']=='forcingchaincontradiction':
+            hint += 'A forcing chain method was used.\n'
+            hint += '        Filling in '+str(resdict['value'])+' in cell '
+            hint += self.printcell(resdict['cell'])+' leads to a contradiction,\n'
+            hint += '        so this candidate can be erased from the cell.\n\n'
+            cells = [resdict['cell']]
         
         else:
             hint = 'Oops, something went wrong, the hint cannot be shown...\n\n'
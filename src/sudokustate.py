@@ -0,0 +1,65 @@
+# imports
+import numpy as np
+from collections import deque
+
+
+class SudokuState(object):
+    ### compact snapshot of the solving state of a sudoku
+    # holds the grid, the candidate bitmasks, the pending propagation events
+    # and the counters kept up to date with them (see Sudoku.recount and Sudoku.isdirty),
+    # but none of the configuration (logging, backend, abortion flag, ...);
+    # taking or restoring a snapshot copies each field separately
+    # (see Sudoku.snapshot and Sudoku.restore): the grid is a numpy array,
+    # the candidates, counters and modification stamps are flat lists, the indices of bivalue cells,
+    # their links and the strong links are sets, and the examination stamps
+    # of the solving methods are a dict (see Sudoku.isdirty), so the cost grows
+    # with the number of entries in these sets and in this dict
+    __slots__ = ['grid', 'masks', 'queue', 'nunfilled', 'ncands',
+                 'placedcounts', 'positioncounts', 'nconflicts', 'bivalues', 'bivaluelinks',
+                 'stronglinks',
+                 'stamp', 'unitstamps', 'valuestamps', 'checkstamps']
+
+    def __init__(self, S):
+        ### initializer: copy the state of a Sudoku object
+        self.grid = np.copy(S.grid)
+        self.masks = list(S.masks)
+        self.queue = list(S.queue)
+        self.nunfilled = S.nunfilled
+        self.ncands = S.ncands
+        self.placedcounts = list(S.placedcounts)
+        self.positioncounts = list(S.positioncounts)
+        self.nconflicts = S.nconflicts
+        self.bivalues = set(S.bivalues)
+        self.bivaluelinks = set(S.bivaluelinks)
+        self.stronglinks = set(S.stronglinks)
+        self.stamp = S.stamp
+        self.unitstamps = list(S.unitstamps)
+        self.valuestamps = list(S.valuestamps)
+        self.checkstamps = dict(S.checkstamps)
+
+    def apply(self, S, share=False):
+        # copy the state into a Sudoku object
+        # input arguments:
+        # - S: the Sudoku object (of the same size)
+        # - share: boolean whether to hand over the lists of this state without copying them
+        #   (only if the state is not used anymore afterwards)
+        if share:
+            (S.grid, S.masks) = (self.grid, self.masks)
+            (S.placedcounts, S.positioncounts) = (self.placedcounts, self.positioncounts)
+            (S.bivalues, S.bivaluelinks) = (self.bivalues, self.bivaluelinks)
+            S.stronglinks = self.stronglinks
+            (S.unitstamps, S.valuestamps) = (self.unitstamps, self.valuestamps)
+            S.checkstamps = self.checkstamps
+        else:
+            (S.grid, S.masks) = (np.copy(self.grid), list(self.masks))
+            (S.placedcounts, S.positioncounts) = (list(self.placedcounts),
+                                                  list(self.positioncounts))
+            (S.bivalues, S.bivaluelinks) = (set(self.bivalues), set(self.bivaluelinks))
+            S.stronglinks = set(self.stronglinks)
+            (S.unitstamps, S.valuestamps) = (list(self.unitstamps), list(self.valuestamps))
+            S.checkstamps = dict(self.checkstamps)
+        S.queue = deque(self.queue)
+        S.nunfilled = self.nunfilled
+        S.ncands = self.ncands
+        S.nconflicts = self.nconflicts
+        S.stamp = self.stamp
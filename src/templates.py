@@ -0,0 +1,82 @@
+# imports
+import os
+import sys
+import tempfile
+import numpy as np
+
+# largest grid size for which templates are used
+# (a 9x9 grid has 46656 templates, a 16x16 grid already far too many to enumerate)
+maxsize = 9
+
+# directory where the templates are cached as .npy files (next to this module)
+cachedir = os.path.dirname(os.path.abspath(__file__))
+
+
+def buildtemplates(size):
+    ### enumerate all templates for a grid of a given size
+    # a template is a placement of a single value in every row, column and block,
+    # given by the column of the value in each row
+    # returns: a 2D numpy array of shape (number of templates, size)
+    blocksize = int(round(np.sqrt(size)))
+    templates = []
+    columns = []
+    def extend(usedcolumns, usedblocks):
+        # recursively choose the column in the next row
+        row = len(columns)
+        if row==size:
+            templates.append(list(columns))
+            return
+        # (a new band of blocks starts every blocksize rows)
+        if row % blocksize==0: usedblocks = set()
+        for column in range(size):
+            if column in usedcolumns or column//blocksize in usedblocks: continue
+            columns.append(column)
+            extend(usedcolumns | set([column]), usedblocks | set([column//blocksize]))
+            columns.pop()
+    extend(set(), set())
+    return np.array(templates, dtype=np.int8)
+
+_templates = {}
+
+def gettemplates(size):
+    # get the (cached) templates for a given grid size (see buildtemplates);
+    # they are read from a file in cachedir if it exists,
+    # else they are built and written to that file for later use
+    # (if the file cannot be written, they are only kept in memory)
+    # note: the file is written under a temporary name and then renamed,
+    #       so that other processes (e.g. the workers of solve_many)
+    #       never read a partially written file
+    if size in _templates: return _templates[size]
+    if size>maxsize:
+        print('ERROR: templates are only supported for grid sizes up to {}'.format(maxsize))
+        sys.exit()
+    filename = os.path.join(cachedir, 'templates{}.npy'.format(size))
+    templates = None
+    if os.path.exists(filename):
+        try: templates = np.load(filename)
+        except (OSError, ValueError, EOFError): templates = None
+    if templates is None:
+        templates = buildtemplates(size)
+        tmpname = None
+        try:
+            (handle, tmpname) = tempfile.mkstemp(dir=cachedir, suffix='.npy',
+                                                 prefix='templates{}_'.format(size))
+            with os.fdopen(handle, 'wb') as tmpfile: np.save(tmpfile, templates)
+            os.chmod(tmpname, 0o644) # (mkstemp only gives access to the owner)
+            os.replace(tmpname, filename)
+        except OSError:
+            if tmpname is not None and os.path.exists(tmpname): os.remove(tmpname)
+    _templates[size] = templates
+    return templates
+
+_indices = {}
+
+def gettemplateindex(size):
+    # get the (cached) indices of the templates (see gettemplates) using each cell:
+    # element [row][column] is an array with the indices of the templates
+    # that place the value in the given column of the given row
+    if size not in _indices:
+        templates = gettemplates(size)
+        _indices[size] = [[np.nonzero(templates[:,row]==column)[0] for column in range(size)]
+                          for row in range(size)]
+    return _indices[size]
@@ -0,0 +1,106 @@
+# imports
+import numpy as np
+
+
+class SudokuTopology(object):
+    ### precomputed index tables describing the groups of a sudoku grid of a given size
+    # cells are identified by their flat index row*size+column;
+    # use gettopology(size) to obtain a cached instance instead of building a new one
+
+    def __init__(self, size):
+        ### initializer: build all index tables
+        # input arguments:
+        # - size: size of the square grid (must be a proper square)
+        self.size = size
+        self.blocksize = int(round(np.sqrt(size)))
+        self.ncells = size*size
+        b = self.blocksize
+
+        # coordinates of each cell
+        self.coords = tuple(divmod(index, size) for index in range(self.ncells))
+
+        # cells in each group, in the same order as getrow, getcolumn and getblock
+        self.rows = tuple(tuple(row*size+column for column in range(size))
+                          for row in range(size))
+        self.columns = tuple(tuple(row*size+column for row in range(size))
+                             for column in range(size))
+        blocks = []
+        for block in range(size):
+            (blockrow, blockcolumn) = divmod(block, b)
+            blocks.append(tuple((blockrow*b+i)*size+blockcolumn*b+j
+                                for i in range(b) for j in range(b)))
+        self.blocks = tuple(blocks)
+        self.groups = {'row': self.rows, 'column': self.columns, 'block': self.blocks}
+
+        # coordinates of each cell in each group (see Sudoku.getcell)
+        self.groupcoords = {}
+        for label, groups in self.groups.items():
+            self.groupcoords[label] = tuple(tuple(self.coords[index] for index in group)
+                                            for group in groups)
+
+        # group indices and group cells for each cell
+        self.cellrow = tuple(row for (row, column) in self.coords)
+        self.cellcolumn = tuple(column for (row, column) in self.coords)
+        self.cellblock = tuple((row//b)*b+column//b for (row, column) in self.coords)
+        self.cellgroups = tuple((self.rows[self.cellrow[index]],
+                                 self.columns[self.cellcolumn[index]],
+                                 self.blocks[self.cellblock[index]])
+                                for index in range(self.ncells))
+
+        # all groups as units numbered 0 until 3*size (not included):
+        # rows first, then columns, then blocks, and the three units of each cell
+        self.units = self.rows + self.columns + self.blocks
+        self.cellunits = tuple((self.cellrow[index], size+self.cellcolumn[index],
+                                2*size+self.cellblock[index])
+                               for index in range(self.ncells))
+
+        # peers of each cell, i.e. all other cells sharing a row, column or block
+        # (sorted in reading order, also available as sets for fast membership tests)
+        peers = []
+        for index in range(self.ncells):
+            peerset = set()
+            for group in self.cellgroups[index]: peerset.update(group)
+            peerset.discard(index)
+            peers.append(tuple(sorted(peerset)))
+        self.peers = tuple(peers)
+        self.peersets = tuple(frozenset(p) for p in self.peers)
+
+        # intersections between blocks and lines (rows or columns)
+        # keyed by (blockindex, linelabel, lineindex), only for intersecting pairs:
+        # - intersections: cells in both the block and the line
+        # - blockremainders: cells in the block but not in the line
+        # - lineremainders: cells in the line but not in the block
+        self.intersections = {}
+        self.blockremainders = {}
+        self.lineremainders = {}
+        for block in range(size):
+            blockcells = set(self.blocks[block])
+            for linelabel in ['row', 'column']:
+                for line in range(size):
+                    linecells = set(self.groups[linelabel][line])
+                    common = blockcells & linecells
+                    if len(common)==0: continue
+                    key = (block, linelabel, line)
+                    self.intersections[key] = tuple(sorted(common))
+                    self.blockremainders[key] = tuple(sorted(blockcells - linecells))
+                    self.lineremainders[key] = tuple(sorted(linecells - blockcells))
+
+        # lines crossing each block, keyed by line label
+        self.blocklines = {'row': tuple(tuple(range((block//b)*b, (block//b+1)*b))
+                                        for block in range(size)),
+                           'column': tuple(tuple(range((block%b)*b, (block%b+1)*b))
+                                           for block in range(size))}
+
+        # blocks crossing each line, keyed by line label
+        self.lineblocks = {'row': tuple(tuple((line//b)*b+k for k in range(b))
+                                        for line in range(size)),
+                           'column': tuple(tuple(k*b+line//b for k in range(b))
+                                           for line in range(size))}
+
+
+_topologies = {}
+
+def gettopology(size):
+    # get the (cached) topology object for a given grid size
+    if size not in _topologies: _topologies[size] = SudokuTopology(size)
+    return _topologies[size]
@@ -0,0 +1,110 @@
+########################################################################
+# Command line tool to solve a large number of sudokus without GUI     #
+# the sudokus are read from a file (or stdin) in one-line format,      #
+# i.e. one sudoku per line as a string of size*size characters         #
+# (e.g. 81 for a 9x9 or 256 for a 16x16 sudoku),                       #
+# with '0' or '.' for empty cells and 1-9, A-Z for values 1-9, 10-35;  #
+# anything after the first whitespace on a line is ignored,            #
+# as are empty lines and lines starting with '#'.                      #
+# for each sudoku, a line '<status> <grid>' is written to the output,  #
+# with status -1 (invalid), 0 (partially solved) or 1 (solved)         #
+# as in Sudoku.terminate, and the grid in the same one-line format.    #
+# usage: python sudokubatch.py [inputfile] [options]                   #
+#        (use -h for a list of options)                                #
+########################################################################
+
+# external modules
+import sys
+import os
+import time
+import argparse
+import numpy as np
+from collections import deque
+
+# local modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from batchsolver import solve_many
+
+# characters used for the values in one-line format
+valuechars = '123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def parseline(line):
+    ### convert a line in one-line format to a grid
+    # returns a 2D numpy array, or None if the line is not a valid sudoku
+    chars = line.upper()
+    size = int(round(np.sqrt(len(chars))))
+    blocksize = int(round(np.sqrt(size)))
+    if size<1 or size*size!=len(chars) or blocksize*blocksize!=size: return None
+    values = []
+    for char in chars:
+        if char in '0.': values.append(0)
+        elif char in valuechars[:size]: values.append(valuechars.index(char)+1)
+        else: return None
+    return np.array(values).reshape(size,size)
+
+def gridtostring(grid):
+    ### convert a grid to one-line format (using '0' for empty cells)
+    return ''.join('0' if value==0 else valuechars[value-1] for value in grid.flatten())
+
+def readpuzzles(infile, puzzles):
+    ### generator yielding the grid (or None if invalid) on each relevant line of a file
+    # the puzzle strings are appended to the list puzzles
+    # note: the file is read line by line, so it is never fully loaded into memory
+    for line in infile:
+        line = line.strip()
+        if len(line)==0 or line.startswith('#'): continue
+        puzzles.append(line.split()[0])
+        yield parseline(puzzles[-1])
+
+
+if __name__=='__main__':
+
+    parser = argparse.ArgumentParser(description='Solve sudokus in one-line format')
+    parser.add_argument('inputfile', nargs='?', default='-',
+                        help='file with one sudoku per line (default: read from stdin)')
+    parser.add_argument('-o', '--outputfile', default='-',
+                        help='file to write the results to (default: write to stdout)')
+    parser.add_argument('--method', default='techniques', choices=['techniques','dlx'],
+                        help='solving method (see Sudoku.solve)')
+    parser.add_argument('--backend', default='python', choices=['python','numpy'],
+                        help='implementation of the basic solving methods')
+    parser.add_argument('--noforcingchain', action='store_true',
+                        help='do not use the forcing chain method')
+    parser.add_argument('--bruteforce', action='store_true',
+                        help='use brute force if the other methods fail')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes (default: 1, use 0 for all cores)')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='time in seconds after which slow solving methods are aborted')
+    args = parser.parse_args()
+
+    infile = sys.stdin if args.inputfile=='-' else open(args.inputfile, 'r')
+    outfile = sys.stdout if args.outputfile=='-' else open(args.outputfile, 'w')
+
+    # solve the puzzles and write the results
+    # (the results come back in input order, so the puzzle strings
+    #  can be removed from the front of the list once they are written)
+    counts = {-1: 0, 0: 0, 1: 0}
+    puzzles = deque()
+    starttime = time.time()
+    results = solve_many(readpuzzles(infile, puzzles), workers=args.workers or None,
+                         method=args.method, backend=args.backend,
+                         useforcingchain=not args.noforcingchain,
+                         usebruteforce=args.bruteforce, timeout=args.timeout)
+    for (index, status, grid, message) in results:
+        puzzle = puzzles.popleft()
+        counts[status] += 1
+        result = puzzle if grid is None else gridtostring(grid)
+        outfile.write('{} {}\n'.format(status, result))
+    elapsed = time.time()-starttime
+
+    if infile is not sys.stdin: infile.close()
+    if outfile is not sys.stdout: outfile.close()
+
+    # print a summary (to stderr, so it does not mix with the results on stdout)
+    npuzzles = sum(counts.values())
+    msg = 'Processed {} sudokus in {:.2f} seconds'.format(npuzzles, elapsed)
+    if npuzzles>0: msg += ' ({:.1f} sudokus per second)'.format(npuzzles/max(elapsed,1e-9))
+    msg += '\n  solved: {}, partially solved: {}, invalid: {}'.format(counts[1], counts[0], counts[-1])
+    sys.stderr.write(msg+'\n')
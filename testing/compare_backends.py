@@ -0,0 +1,83 @@
+########################################################################
+# Consistency check of the different solving configurations            #
+# solves all example sudokus in fls/ and testing/*/ with:               #
+# - the python backend with incremental propagation (reference)         #
+# - the python backend with repeated sweeps (autopropagate=False)       #
+# - the numpy backend                                                   #
+# - the dancing links exact cover search                                #
+# and checks that the resulting grids and candidates are identical.     #
+# usage: python testing/compare_backends.py                             #
+########################################################################
+
+# imports
+import sys
+import os
+import glob
+import numpy as np
+thisdir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(thisdir, '../src'))
+from sudoku import Sudoku
+
+
+def getexamples():
+    ### get a list of (name, grid) for all example sudokus
+    files = sorted(glob.glob(os.path.join(thisdir, '../fls/*.txt'))
+                   + glob.glob(os.path.join(thisdir, '*/*.txt')))
+    examples = []
+    for f in files:
+        name = os.path.relpath(f, os.path.join(thisdir, '..'))
+        examples.append((name, np.loadtxt(f).astype(int)))
+    return examples
+
+def solvetechniques(grid, **kwargs):
+    ### solve a sudoku with the human-like solving methods
+    # note: the forcing chain is not used, as it is slow on near-empty grids
+    #       and it does not depend on the backend
+    S = Sudoku(grid, verbose=False, **kwargs)
+    (outputcode, _) = S.solve(useforcingchain=False)
+    return (outputcode, S)
+
+def compare(name, refname, ref, othername, other):
+    ### compare the grids and candidates of two solved sudokus
+    # returns the number of differences
+    ndiffs = 0
+    if not np.array_equal(ref.grid, other.grid):
+        print('  DIFFERENCE in grid between {} and {}'.format(refname, othername))
+        ndiffs += 1
+    if ref.masks!=other.masks:
+        print('  DIFFERENCE in candidates between {} and {}'.format(refname, othername))
+        ndiffs += 1
+    return ndiffs
+
+
+if __name__=='__main__':
+
+    ndiffs = 0
+    for (name, grid) in getexamples():
+        print('checking {}...'.format(name))
+        # human-like solving methods with all backends
+        (refcode, ref) = solvetechniques(grid)
+        (code, sweeps) = solvetechniques(grid, autopropagate=False)
+        ndiffs += compare(name, 'propagation', ref, 'sweeps', sweeps)
+        (code, numpy) = solvetechniques(grid, backend='numpy')
+        ndiffs += compare(name, 'propagation', ref, 'numpy', numpy)
+        # exact cover search
+        S = Sudoku(grid, verbose=False)
+        nsolutions = S.countsolutions(maxsolutions=2)
+        print('  techniques: {}, dlx: {} solution(s)'.format(
+              'solved' if refcode==1 else 'not solved', nsolutions))
+        if refcode==1 and nsolutions!=1:
+            print('  DIFFERENCE: solved by techniques but dlx found {} solutions'.format(nsolutions))
+            ndiffs += 1
+        if nsolutions==1:
+            S.solve(method='dlx')
+            if refcode==1 and not np.array_equal(ref.grid, S.grid):
+                print('  DIFFERENCE in grid between techniques and dlx')
+                ndiffs += 1
+            # all cells filled by the techniques must agree with the unique solution
+            filled = (ref.grid!=0)
+            if not np.array_equal(ref.grid[filled], S.grid[filled]):
+                print('  DIFFERENCE: techniques filled a cell inconsistent with the solution')
+                ndiffs += 1
+    print('number of differences: {}'.format(ndiffs))
+    if ndiffs>0: sys.exit(1)